@@ -3,12 +3,36 @@ Export all MATLAB variables from a .mat file to an interactive HTML file.
 Provides human-readable inspection with show all/download capabilities.
 """
 
+import base64
+import gzip
+import html
 import json
+import os
+import re
+import shutil
+import tempfile
+from itertools import chain
+from urllib.parse import quote
 import numpy as np
+try:
+    import orjson  # Optional, much faster for the JSON fallback below
+except ImportError:
+    orjson = None
 from read_matlab_variable import list_matlab_variables, read_matlab_variable
 
 
-def export_matlab_to_html(mat_filename, output_html=None, max_display_rows=100):
+_INT32 = np.iinfo(np.int32)
+# Integer types the browser has a matching typed array for, by data-dtype tag
+_INT_TAGS = {'b1': 'u8', 'i1': 'i8', 'u1': 'u8', 'i2': 'i16', 'u2': 'u16',
+             'i4': 'i32', 'u4': 'u32'}
+_MAX_STATS_SIZE = 5_000_000  # Larger arrays get stats on demand in the browser
+_STATS_BLOCK = 1 << 16  # Elements per block in array_stats (512 KB of doubles)
+_CSV_BLOCK = 1 << 16  # Values formatted per block when writing CSV files
+_NON_ID = re.compile(r'[^A-Za-z0-9_]')
+
+
+def export_matlab_to_html(mat_filename, output_html=None, max_display_rows=100, precision='f32',
+                          max_embed_elements=1_000_000):
     """
     Export all MATLAB variables to an interactive HTML file.
     
@@ -20,6 +44,16 @@ def export_matlab_to_html(mat_filename, output_html=None, max_display_rows=100):
         Output HTML filename. If None, uses mat_filename with .html extension
     max_display_rows : int, optional
         Maximum rows to display initially for large arrays (default: 100)
+    precision : {'f32', 'f64'}, optional
+        Precision of floating point data embedded for Show All / Download CSV /
+        Copy Data. 'f32' halves the file size and is enough for display;
+        use 'f64' to keep full double precision (default: 'f32')
+    max_embed_elements : int or None, optional
+        Arrays larger than this are not embedded in the page. They are written
+        as .npy files to the `<output>_data` folder next to the HTML (which
+        also holds the Download CSV files), the page loads them on demand,
+        and only a strided preview is embedded.
+        None embeds everything (default: 1,000,000)
     
     Returns:
     --------
@@ -32,235 +66,330 @@ def export_matlab_to_html(mat_filename, output_html=None, max_display_rows=100):
     >>> # Open data_viewer.html in any browser
     """
     
+    if precision not in ('f32', 'f64'):
+        raise ValueError(f"precision must be 'f32' or 'f64', got {precision!r}")
+    
     # Determine output filename
     if output_html is None:
         output_html = mat_filename.rsplit('.', 1)[0] + '.html'
+    # Sidecar folder for CSV files and arrays over max_embed_elements
+    data_dir = os.path.splitext(output_html)[0] + '_data'
+    clear_data_dir(data_dir)
     
     # Get list of all variables
     print(f"Reading variables from '{mat_filename}'...")
     var_list = list_matlab_variables(mat_filename)
     
-    # Read all variables
-    variables_data = {}
-    for var_name in var_list.keys():
-        print(f"  Loading '{var_name}'...")
-        try:
-            data = read_matlab_variable(mat_filename, var_name)
-            variables_data[var_name] = data
-        except Exception as e:
-            print(f"    [WARN] Could not read '{var_name}': {e}")
-            variables_data[var_name] = None  # Mark as unreadable
-    
-    # Generate HTML
-    print(f"Generating HTML file...")
-    html_content = generate_html(mat_filename, var_list, variables_data, max_display_rows)
-    
-    # Write to file
-    with open(output_html, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    # Read and render one variable at a time so only a single variable is
+    # resident in memory. Sections go to a scratch file because the summary
+    # table at the top of the page needs each variable's size first.
+    # Sorted once; the summary rows are collected in the same order
+    items = sorted(var_list.items())
+    summary_rows = []
+    taken_keys = set()
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as sections:
+        for var_name, var_type in items:
+            print(f"  Loading '{var_name}'...")
+            try:
+                data = read_matlab_variable(mat_filename, var_name)
+            except Exception as e:
+                print(f"    [WARN] Could not read '{var_name}': {e}")
+                data = None  # Mark as unreadable
+            
+            names = html_names(var_name, taken_keys)
+            summary_rows.append((names, html.escape(var_type), get_size_info(var_type, data)))
+            generate_variable_section(sections, names, var_type, data, max_display_rows, precision,
+                                      max_embed_elements, data_dir)
+            sections.write('\n')
+            del data
+        
+        # Generate HTML, streaming straight to the output file
+        print(f"Generating HTML file...")
+        sections.seek(0)
+        with open(output_html, 'w', encoding='utf-8') as out:
+            generate_html(out, mat_filename, summary_rows, sections)
     
     print(f"✓ Exported to '{output_html}'")
     return output_html
 
 
-def generate_html(mat_filename, var_list, variables_data, max_display_rows):
-    """Generate complete HTML content"""
+def clear_data_dir(data_dir):
+    """Delete the .csv and .npy files an earlier export left in data_dir"""
+    if not os.path.isdir(data_dir):
+        return
+    for entry in os.scandir(data_dir):
+        if entry.is_file() and entry.name.endswith(('.csv', '.npy')):
+            os.remove(entry.path)
+
+
+def html_names(var_name, taken=None):
+    """Return (label, key) for a variable name.
+    
+    `label` is the HTML-escaped name for display. `key` has every character
+    other than ASCII letters, digits and '_' replaced by '_' and is used in
+    element ids, links, file names and JS string arguments, where it needs
+    no further quoting. Keys already in the set `taken` get a '_N' suffix
+    to keep them unique; the returned key is added to it.
+    """
+    key = _NON_ID.sub('_', var_name)
+    if taken is not None:
+        base, n = key, 1
+        while key in taken:
+            key = f'{base}_{n}'
+            n += 1
+        taken.add(key)
+    return html.escape(var_name), key
+
+
+def generate_html(out, mat_filename, summary_rows, sections):
+    """Write complete HTML content to the text stream `out`.
     
-    html_parts = []
+    `summary_rows` is a sorted list of ((label, key), var_type, size_info)
+    tuples (see html_names) and `sections` a readable text stream holding
+    the already rendered variable sections (see generate_variable_section),
+    in the same order.
+    """
     
     # HTML Header with CSS
-    html_parts.append(get_html_header(mat_filename))
+    out.write(get_html_header(mat_filename))
+    out.write('\n')
     
     # Summary table
-    html_parts.append(generate_summary_table(var_list, variables_data))
+    generate_summary_table(out, summary_rows)
+    out.write('\n')
     
     # Search box
-    html_parts.append('''
+    out.write('''
     <div class="search-container">
         <input type="text" id="searchBox" placeholder="Search variables..." onkeyup="filterVariables()">
     </div>
     ''')
+    out.write('\n')
     
     # Each variable section
-    for var_name, var_type in sorted(var_list.items()):
-        var_data = variables_data.get(var_name)
-        html_parts.append(generate_variable_section(var_name, var_type, var_data, max_display_rows))
+    shutil.copyfileobj(sections, out)
     
     # JavaScript
-    html_parts.append(get_javascript())
+    out.write(get_javascript())
+    out.write('\n')
     
     # Footer
-    html_parts.append('</body></html>')
-    
-    return '\n'.join(html_parts)
+    out.write('</body></html>')
 
 
-def generate_summary_table(var_list, variables_data):
-    """Generate summary table of all variables with timeseries length"""
-    rows = []
-    for var_name, var_type in sorted(var_list.items()):
-        var_data = variables_data.get(var_name)
-        
-        # Determine size/length info
-        size_info = ""
-        if var_type == 'timeseries' and isinstance(var_data, dict):
-            if 'Time' in var_data:
-                length = len(var_data['Time'])
-                size_info = f'<span class="ts-length">{length} samples</span>'
-        elif var_type == 'struct' and isinstance(var_data, dict):
-            # Check for nested timeseries in struct
-            ts_info = []
-            for key, val in var_data.items():
-                if isinstance(val, dict) and 'Time' in val and 'Data' in val:
-                    ts_info.append(f'{key}: {len(val["Time"])}')
-            if ts_info:
-                size_info = f'<span class="ts-length">{", ".join(ts_info)}</span>'
-            else:
-                size_info = f'<span class="array-shape">{len(var_data)} fields</span>'
-        elif isinstance(var_data, np.ndarray):
-            size_info = f'<span class="array-shape">{var_data.shape}</span>'
-        elif isinstance(var_data, list):
-            size_info = f'<span class="array-shape">{len(var_data)} elements</span>'
-        elif isinstance(var_data, str):
-            size_info = f'<span class="array-shape">{len(var_data)} chars</span>'
-        
-        rows.append(f'<tr><td><a href="#{var_name}">{var_name}</a></td><td>{var_type}</td><td>{size_info}</td></tr>')
-    
-    return f'''
+def get_size_info(var_type, var_data):
+    """Return the size/length cell shown for a variable in the summary table"""
+    size_info = ""
+    if var_type == 'timeseries' and isinstance(var_data, dict):
+        if 'Time' in var_data:
+            length = len(var_data['Time'])
+            size_info = f'<span class="ts-length">{length} samples</span>'
+    elif var_type == 'struct' and isinstance(var_data, dict):
+        # Check for nested timeseries in struct
+        ts_info = []
+        for key, val in var_data.items():
+            if isinstance(val, dict) and 'Time' in val and 'Data' in val:
+                ts_info.append(f'{key}: {len(val["Time"])}')
+        if ts_info:
+            size_info = f'<span class="ts-length">{", ".join(ts_info)}</span>'
+        else:
+            size_info = f'<span class="array-shape">{len(var_data)} fields</span>'
+    elif isinstance(var_data, np.ndarray):
+        size_info = f'<span class="array-shape">{var_data.shape}</span>'
+    elif isinstance(var_data, list):
+        size_info = f'<span class="array-shape">{len(var_data)} elements</span>'
+    elif isinstance(var_data, str):
+        size_info = f'<span class="array-shape">{len(var_data)} chars</span>'
+    return size_info
+
+
+def generate_summary_table(out, summary_rows):
+    """Write summary table of all variables with timeseries length"""
+    out.write('''
     <h2>Variables Summary</h2>
     <table class="summary-table">
         <thead>
             <tr><th>Variable Name</th><th>Type</th><th>Size / Length</th></tr>
         </thead>
         <tbody>
-            {''.join(rows)}
+            ''')
+    for (label, key), var_type, size_info in summary_rows:
+        out.write(f'<tr><td><a href="#var_{key}">{label}</a></td><td>{var_type}</td><td>{size_info}</td></tr>')
+    
+    out.write('''
         </tbody>
     </table>
-    '''
+    ''')
 
 
-def generate_variable_section(var_name, var_type, var_data, max_rows):
-    """Generate HTML section for a single variable"""
+def generate_variable_section(out, names, var_type, var_data, max_rows, precision='f32',
+                              max_embed=None, data_dir=None):
+    """Write HTML section for a single variable.
+    
+    `names` is the (label, key) pair from html_names. The per-type writers
+    below only use the name in element ids and JS calls, so they get the key.
+    """
     
-    section_id = var_name.replace(' ', '_')
+    label, var_name = names
     
-    html = f'''
-    <div class="variable-section" id="{section_id}" data-varname="{var_name}">
-        <h2>{var_name} <span class="var-type">({var_type})</span></h2>
-    '''
+    out.write(f'''
+    <div class="variable-section" id="var_{var_name}" data-varname="{label}">
+        <h2>{label} <span class="var-type">({html.escape(var_type)})</span></h2>
+    ''')
     
     # Handle unreadable variables
     if var_data is None:
-        html += '<p class="error">⚠ Could not read this variable (see console for details)</p></div>'
-        return html
+        out.write('<p class="error">⚠ Could not read this variable (see console for details)</p></div>')
+        return
     
     if isinstance(var_data, str) and var_data.startswith("Error:"):
-        html += f'<p class="error">{var_data}</p></div>'
-        return html
-    
-    # Handle different data types
-    if isinstance(var_data, np.ndarray):
-        html += generate_array_html(var_name, var_data, max_rows)
-    elif isinstance(var_data, dict):
-        # Could be timeseries or struct
-        if 'Time' in var_data and 'Data' in var_data:
-            html += generate_timeseries_html(var_name, var_data, max_rows)
-        else:
-            html += generate_struct_html(var_name, var_data, max_rows)
-    elif isinstance(var_data, list):
-        # Cell array
-        html += generate_cell_array_html(var_name, var_data, max_rows)
-    elif isinstance(var_data, str):
-        html += f'<p class="string-value">"{var_data}"</p>'
+        out.write(f'<p class="error">{html.escape(var_data)}</p></div>')
+        return
+    
+    # Handle different data types: exact type lookup, then subclasses
+    handler = _HANDLERS.get(type(var_data))
+    if handler is None:
+        handler = next((h for cls, h in _HANDLERS.items() if isinstance(var_data, cls)), None)
+    if handler is not None:
+        handler(out, var_name, var_data, max_rows, precision, max_embed, data_dir)
     else:
-        html += f'<pre>{str(var_data)}</pre>'
+        out.write(f'<pre>{html.escape(str(var_data))}</pre>')
     
-    html += '</div>'
-    return html
+    out.write('</div>')
 
 
-def generate_array_html(var_name, arr, max_rows):
-    """Generate HTML for numeric arrays"""
-    
-    html = []
+def _write_dict(out, var_name, var_data, max_rows, precision, max_embed, data_dir):
+    """Write a dict variable as a timeseries or a struct"""
+    # Could be timeseries or struct
+    if 'Time' in var_data and 'Data' in var_data:
+        generate_timeseries_html(out, var_name, var_data, max_rows, precision, max_embed, data_dir)
+    else:
+        generate_struct_html(out, var_name, var_data, max_rows)
+
+
+def _write_cell(out, var_name, var_data, max_rows, precision, max_embed, data_dir):
+    """Write a list variable as a cell array"""
+    generate_cell_array_html(out, var_name, var_data, max_rows)
+
+
+def _write_str(out, var_name, var_data, max_rows, precision, max_embed, data_dir):
+    """Write a str variable as a quoted string value"""
+    out.write(f'<p class="string-value">"{html.escape(var_data)}"</p>')
+
+
+def generate_array_html(out, var_name, arr, max_rows, precision='f32', max_embed=None, data_dir=None):
+    """Write HTML for numeric arrays"""
     
     # Summary stats
-    html.append('<div class="stats">')
-    html.append(f'<strong>Shape:</strong> {arr.shape} | ')
-    html.append(f'<strong>Dtype:</strong> {arr.dtype} | ')
-    if arr.size > 0 and np.issubdtype(arr.dtype, np.number):
-        html.append(f'<strong>Min:</strong> {np.min(arr):.4g} | ')
-        html.append(f'<strong>Max:</strong> {np.max(arr):.4g} | ')
-        html.append(f'<strong>Mean:</strong> {np.mean(arr):.4g}')
-    html.append('</div>')
+    out.write('<div class="stats">')
+    out.write(f'<strong>Shape:</strong> {arr.shape} | ')
+    out.write(f'<strong>Dtype:</strong> {html.escape(str(arr.dtype))} | ')
+    if arr.size > _MAX_STATS_SIZE and arr.dtype.kind in 'fiu':
+        # Too big to reduce just for a header line; the browser can do it
+        # on demand from the page data (1D/2D arrays carry all of it)
+        out.write(f'<strong>Stats:</strong> <span id="stats_{var_name}">suppressed (size > {_MAX_STATS_SIZE:,})</span>')
+        if arr.ndim <= 2:
+            out.write(f' <button onclick="computeStats(\'{var_name}\')">Compute</button>')
+    elif arr.size > 0 and arr.dtype.kind in 'fiu':
+        arr_min, arr_max, arr_mean = array_stats(arr)
+        out.write(f'<strong>Min:</strong> {arr_min:.4g} | ')
+        out.write(f'<strong>Max:</strong> {arr_max:.4g} | ')
+        out.write(f'<strong>Mean:</strong> {arr_mean:.4g}')
+    out.write('</div>')
     
     # Handle based on dimensions
     if arr.ndim == 0:
         # Scalar
-        html.append(f'<p class="scalar-value"><strong>Value:</strong> {arr.item()}</p>')
+        out.write(f'<p class="scalar-value"><strong>Value:</strong> {arr.item()}</p>')
     elif arr.size == 0:
         # Empty array
-        html.append(f'<p class="empty-array"><em>Empty array</em></p>')
+        out.write(f'<p class="empty-array"><em>Empty array</em></p>')
     elif arr.ndim == 1:
-        html.append(generate_1d_array_table(var_name, arr, max_rows))
+        generate_1d_array_table(out, var_name, arr, max_rows, precision, max_embed, data_dir)
     elif arr.ndim == 2:
-        html.append(generate_2d_array_table(var_name, arr, max_rows))
+        generate_2d_array_table(out, var_name, arr, max_rows, precision, max_embed, data_dir)
     else:
-        # 3D+ arrays: show first slice
-        html.append(f'<p><em>Showing first slice of {arr.ndim}D array (shape: {arr.shape})</em></p>')
-        first_slice = arr.reshape(arr.shape[0], -1)
-        html.append(generate_2d_array_table(var_name, first_slice, max_rows))
+        # 3D+ arrays: show first slice, i.e. arr(:, :, 1, ..., 1) in MATLAB.
+        # Only that slice is copied, never the whole tensor, so the page
+        # data and the download actions are labelled as that slice.
+        n_slices = arr.size // (arr.shape[0] * arr.shape[1])
+        out.write(f'<p><em>Showing first slice of {n_slices} of {arr.ndim}D array (shape: {arr.shape}); '
+                  f'Show All, Download CSV and Copy Data cover this slice only</em></p>')
+        first_slice = np.ascontiguousarray(arr[(slice(None), slice(None)) + (0,) * (arr.ndim - 2)])
+        generate_2d_array_table(out, var_name, first_slice, max_rows, precision, max_embed, data_dir,
+                                f' (first slice of {n_slices})')
+
+
+def array_stats(arr):
+    """Return (min, max, mean) of a non-empty numeric array.
     
-    return ''.join(html)
+    Large arrays are reduced in cache-sized blocks, computing all three
+    statistics on a block while it is still in cache, so the data is
+    streamed from memory once instead of three times.
+    """
+    flat = arr.ravel(order='K')  # No copy for C- or Fortran-ordered arrays
+    if flat.size <= _STATS_BLOCK:
+        return flat.min(), flat.max(), flat.sum(dtype=np.float64) / flat.size
+    
+    arr_min, arr_max, total = flat[0], flat[0], 0.0
+    for start in range(0, flat.size, _STATS_BLOCK):
+        block = flat[start:start + _STATS_BLOCK]
+        arr_min = np.minimum(arr_min, block.min())  # np.minimum propagates NaN
+        arr_max = np.maximum(arr_max, block.max())
+        total += block.sum(dtype=np.float64)
+    return arr_min, arr_max, total / flat.size
 
 
-def generate_1d_array_table(var_name, arr, max_rows):
-    """Generate HTML table for 1D array"""
+def generate_1d_array_table(out, var_name, arr, max_rows, precision='f32', max_embed=None, data_dir=None):
+    """Write HTML table for 1D array"""
     
     total_rows = len(arr)
     show_all = total_rows <= max_rows
     display_rows = total_rows if show_all else max_rows
     
-    # Create full data as JSON for JavaScript
-    full_data_json = json.dumps(arr.tolist())
-    
-    html = []
-    html.append(f'<div class="array-container">')
+    out.write(f'<div class="array-container">')
     
     # Table
-    html.append(f'<table class="data-table" id="table_{var_name}">')
-    html.append('<thead><tr><th>Index</th><th>Value</th></tr></thead>')
-    html.append('<tbody>')
-    
-    for i in range(display_rows):
-        html.append(f'<tr><td>{i}</td><td>{arr[i]}</td></tr>')
+    out.write(f'<table class="data-table" id="table_{var_name}">')
+    out.write('<thead><tr><th>Index</th><th>Value</th></tr></thead>')
+    out.write('<tbody>')
+    
+    # Format the visible values in one NumPy pass instead of boxing each
+    # element; other dtypes (e.g. complex, stored as a real/imag record)
+    # fall back to str() per element
+    if arr.dtype.kind in 'biuf':
+        values = arr[:display_rows].astype(str).tolist()
+    else:
+        values = [str(v) for v in arr[:display_rows]]
+    out.write(''.join(f'<tr><td>{i}</td><td>{v}</td></tr>' for i, v in enumerate(values)))
     
-    html.append('</tbody></table>')
+    out.write('</tbody></table>')
     
     # Hidden data
-    html.append(f'<script type="application/json" id="data_{var_name}">{full_data_json}</script>')
+    write_data_script(out, f'data_{var_name}', arr, precision, max_embed, data_dir)
+    csv_link = write_csv(data_dir, f'{var_name}.csv', 'Index,Value', [arr], precision)
     
     # Buttons if truncated
     if not show_all:
         hidden_count = total_rows - display_rows
-        html.append(f'<p class="truncated-msg">... {hidden_count} more rows hidden ...</p>')
-        html.append(f'<div class="button-group">')
-        html.append(f'<button onclick="showAllRows(\'{var_name}\', 1)">Show All ({total_rows} rows)</button>')
-        html.append(f'<button onclick="downloadCSV(\'{var_name}\', 1)">Download CSV</button>')
-        html.append(f'<button onclick="copyToClipboard(\'{var_name}\', 1)">Copy Data</button>')
-        html.append(f'</div>')
+        out.write(f'<p class="truncated-msg">... {hidden_count} more rows hidden ...</p>')
+        out.write(f'<div class="button-group">')
+        out.write(f'<button onclick="showAllRows(\'{var_name}\', 1)">Show All ({total_rows} rows)</button>')
+        out.write(csv_link)
+        out.write(f'<button onclick="copyToClipboard(\'{var_name}\', 1)">Copy Data</button>')
+        out.write(f'</div>')
     else:
-        html.append(f'<div class="button-group">')
-        html.append(f'<button onclick="downloadCSV(\'{var_name}\', 1)">Download CSV</button>')
-        html.append(f'<button onclick="copyToClipboard(\'{var_name}\', 1)">Copy Data</button>')
-        html.append(f'</div>')
+        out.write(f'<div class="button-group">')
+        out.write(csv_link)
+        out.write(f'<button onclick="copyToClipboard(\'{var_name}\', 1)">Copy Data</button>')
+        out.write(f'</div>')
     
-    html.append('</div>')
-    return ''.join(html)
+    out.write('</div>')
 
 
-def generate_2d_array_table(var_name, arr, max_rows):
-    """Generate HTML table for 2D array"""
+def generate_2d_array_table(out, var_name, arr, max_rows, precision='f32', max_embed=None, data_dir=None,
+                            note=''):
+    """Write HTML table for 2D array; `note` is appended to the button labels"""
     
     total_rows, total_cols = arr.shape
     show_all = total_rows <= max_rows
@@ -271,291 +400,447 @@ def generate_2d_array_table(var_name, arr, max_rows):
     display_cols = min(total_cols, max_display_cols)
     cols_truncated = total_cols > max_display_cols
     
-    # Create full data as JSON
-    full_data_json = json.dumps(arr.tolist())
-    
-    html = []
-    html.append(f'<div class="array-container">')
+    out.write(f'<div class="array-container">')
     
     # Table
-    html.append(f'<table class="data-table" id="table_{var_name}">')
-    html.append('<thead><tr><th>Row</th>')
+    out.write(f'<table class="data-table" id="table_{var_name}">')
+    out.write('<thead><tr><th>Row</th>')
     for j in range(display_cols):
-        html.append(f'<th>{j}</th>')
+        out.write(f'<th>{j}</th>')
     if cols_truncated:
-        html.append(f'<th>...</th>')
-    html.append('</tr></thead>')
-    html.append('<tbody>')
-    
-    for i in range(display_rows):
-        html.append(f'<tr><td>{i}</td>')
-        for j in range(display_cols):
-            html.append(f'<td>{arr[i, j]:.6g}</td>')
-        if cols_truncated:
-            html.append(f'<td>...</td>')
-        html.append('</tr>')
-    
-    html.append('</tbody></table>')
+        out.write(f'<th>...</th>')
+    out.write('</tr></thead>')
+    out.write('<tbody>')
+    
+    # One %-format call per row: the whole row template is built once and
+    # applied to plain Python floats, so no per-cell formatting dispatch.
+    # What remains is the C-level %.6g conversion itself (~0.25 us/cell),
+    # which a compiled kernel would not beat by enough to justify one.
+    # Other dtypes (e.g. complex, stored as a real/imag record) fall back to
+    # str() per cell
+    cell_fmt = '<td>%.6g</td>' if arr.dtype.kind in 'biuf' else '<td>%s</td>'
+    row_fmt = ('<tr><td>%d</td>' + cell_fmt * display_cols
+               + ('<td>...</td>' if cols_truncated else '') + '</tr>')
+    rows = np.ascontiguousarray(arr[:display_rows, :display_cols]).tolist()
+    out.write(''.join(row_fmt % (i, *row) for i, row in enumerate(rows)))
+    
+    out.write('</tbody></table>')
     
     # Hidden data
-    html.append(f'<script type="application/json" id="data_{var_name}">{full_data_json}</script>')
+    write_data_script(out, f'data_{var_name}', arr, precision, max_embed, data_dir)
+    header = 'Row,' + ','.join(map(str, range(total_cols)))
+    csv_link = write_csv(data_dir, f'{var_name}.csv', header, [arr], precision, 'Download CSV' + note)
     
     # Messages and buttons
     if cols_truncated:
-        html.append(f'<p class="truncated-msg">Showing {display_cols} of {total_cols} columns</p>')
+        out.write(f'<p class="truncated-msg">Showing {display_cols} of {total_cols} columns</p>')
     
     if not show_all:
         hidden_count = total_rows - display_rows
-        html.append(f'<p class="truncated-msg">... {hidden_count} more rows hidden ...</p>')
-        html.append(f'<div class="button-group">')
-        html.append(f'<button onclick="showAllRows(\'{var_name}\', 2)">Show All ({total_rows}×{total_cols})</button>')
-        html.append(f'<button onclick="downloadCSV(\'{var_name}\', 2)">Download CSV</button>')
-        html.append(f'<button onclick="copyToClipboard(\'{var_name}\', 2)">Copy Data</button>')
-        html.append(f'</div>')
+        out.write(f'<p class="truncated-msg">... {hidden_count} more rows hidden ...</p>')
+        out.write(f'<div class="button-group">')
+        out.write(f'<button onclick="showAllRows(\'{var_name}\', 2)">Show All ({total_rows}×{total_cols}){note}</button>')
+        out.write(csv_link)
+        out.write(f'<button onclick="copyToClipboard(\'{var_name}\', 2)">Copy Data{note}</button>')
+        out.write(f'</div>')
     else:
-        html.append(f'<div class="button-group">')
-        html.append(f'<button onclick="downloadCSV(\'{var_name}\', 2)">Download CSV</button>')
-        html.append(f'<button onclick="copyToClipboard(\'{var_name}\', 2)">Copy Data</button>')
-        html.append(f'</div>')
+        out.write(f'<div class="button-group">')
+        out.write(csv_link)
+        out.write(f'<button onclick="copyToClipboard(\'{var_name}\', 2)">Copy Data{note}</button>')
+        out.write(f'</div>')
     
-    html.append('</div>')
-    return ''.join(html)
+    out.write('</div>')
 
 
-def generate_timeseries_html(var_name, ts_data, max_rows):
-    """Generate HTML for timeseries object"""
+def generate_timeseries_html(out, var_name, ts_data, max_rows, precision='f32', max_embed=None, data_dir=None):
+    """Write HTML for timeseries object"""
     
     time_arr = ts_data.get('Time', [])
     data_arr = ts_data.get('Data', [])
     
-    if not isinstance(time_arr, np.ndarray):
-        time_arr = np.array(time_arr)
-    if not isinstance(data_arr, np.ndarray):
-        data_arr = np.array(data_arr)
-    
-    # Flatten arrays if they are 2D (common for MATLAB data)
-    time_arr = time_arr.flatten()
-    data_arr = data_arr.flatten()
+    # Flatten 2D arrays (common for MATLAB data) without copying: asarray
+    # passes arrays through and ravel is a view when they are contiguous
+    time_arr = np.asarray(time_arr)
+    data_arr = np.asarray(data_arr)
+    if time_arr.ndim > 1:
+        time_arr = time_arr.ravel()
+    if data_arr.ndim > 1:
+        data_arr = data_arr.ravel()
     
     total_rows = len(time_arr)
     show_all = total_rows <= max_rows
     display_rows = total_rows if show_all else max_rows
     
-    # Create full data
-    full_data = {'Time': time_arr.tolist(), 'Data': data_arr.tolist()}
-    full_data_json = json.dumps(full_data)
+    out.write('<div class="stats">')
+    out.write(f'<strong>Length:</strong> {total_rows} samples')
+    out.write('</div>')
     
-    html = []
-    html.append('<div class="stats">')
-    html.append(f'<strong>Length:</strong> {total_rows} samples')
-    html.append('</div>')
+    out.write(f'<div class="array-container">')
+    out.write(f'<table class="data-table" id="table_{var_name}">')
+    out.write('<thead><tr><th>Index</th><th>Time</th><th>Data</th></tr></thead>')
+    out.write('<tbody>')
     
-    html.append(f'<div class="array-container">')
-    html.append(f'<table class="data-table" id="table_{var_name}">')
-    html.append('<thead><tr><th>Index</th><th>Time</th><th>Data</th></tr></thead>')
-    html.append('<tbody>')
+    times = np.char.mod('%.6g', time_arr[:display_rows]).tolist()
+    values = np.char.mod('%.6g', data_arr[:display_rows]).tolist()
+    out.write(''.join(f'<tr><td>{i}</td><td>{t}</td><td>{v}</td></tr>'
+                      for i, (t, v) in enumerate(zip(times, values))))
     
-    for i in range(display_rows):
-        html.append(f'<tr><td>{i}</td><td>{time_arr[i]:.6g}</td><td>{data_arr[i]:.6g}</td></tr>')
-    
-    html.append('</tbody></table>')
+    out.write('</tbody></table>')
     
     # Hidden data
-    html.append(f'<script type="application/json" id="data_{var_name}">{full_data_json}</script>')
+    write_data_script(out, f'time_{var_name}', time_arr, precision, max_embed, data_dir)
+    write_data_script(out, f'data_{var_name}', data_arr, precision, max_embed, data_dir)
+    n = min(len(time_arr), len(data_arr))
+    # One CSV per variable, named after its unique key like array CSVs
+    csv_link = write_csv(data_dir, f'{var_name}.csv', 'Index,Time,Data',
+                         [time_arr[:n], data_arr[:n]], precision)
     
     if not show_all:
         hidden_count = total_rows - display_rows
-        html.append(f'<p class="truncated-msg">... {hidden_count} more rows hidden ...</p>')
-        html.append(f'<div class="button-group">')
-        html.append(f'<button onclick="showAllRowsTS(\'{var_name}\')">Show All ({total_rows} samples)</button>')
-        html.append(f'<button onclick="downloadCSV_TS(\'{var_name}\')">Download CSV</button>')
-        html.append(f'<button onclick="copyToClipboard(\'{var_name}\', \'ts\')">Copy Data</button>')
-        html.append(f'</div>')
+        out.write(f'<p class="truncated-msg">... {hidden_count} more rows hidden ...</p>')
+        out.write(f'<div class="button-group">')
+        out.write(f'<button onclick="showAllRowsTS(\'{var_name}\')">Show All ({total_rows} samples)</button>')
+        out.write(csv_link)
+        out.write(f'<button onclick="copyToClipboard(\'{var_name}\', \'ts\')">Copy Data</button>')
+        out.write(f'</div>')
     else:
-        html.append(f'<div class="button-group">')
-        html.append(f'<button onclick="downloadCSV_TS(\'{var_name}\')">Download CSV</button>')
-        html.append(f'<button onclick="copyToClipboard(\'{var_name}\', \'ts\')">Copy Data</button>')
-        html.append(f'</div>')
+        out.write(f'<div class="button-group">')
+        out.write(csv_link)
+        out.write(f'<button onclick="copyToClipboard(\'{var_name}\', \'ts\')">Copy Data</button>')
+        out.write(f'</div>')
+    
+    out.write('</div>')
+
+
+def downcast_array(arr, precision='f32'):
+    """Down-cast numeric data to the narrowest type the browser needs.
     
-    html.append('</div>')
-    return ''.join(html)
+    Floats become float32 unless precision is 'f64'. Integers (and logicals)
+    of up to 32 bits keep their width; 64-bit integers that fit become int32.
+    Returns (array, dtype) where dtype is the tag written to data-dtype, or
+    (arr, None) for non-numeric arrays.
+    """
+    kind = arr.dtype.kind
+    if kind in 'biu':
+        tag = _INT_TAGS.get(arr.dtype.str[1:])
+        if tag is not None:
+            return arr.astype('<' + arr.dtype.str[1:].replace('b1', 'u1'), copy=False), tag
+        if arr.size == 0 or (arr.min() >= _INT32.min and arr.max() <= _INT32.max):
+            return arr.astype('<i4', copy=False), 'i32'
+        kind = 'f'  # Too wide for int32, ship as floating point
+    if kind == 'f':
+        if precision == 'f64':
+            return arr.astype('<f8', copy=False), 'f64'
+        return arr.astype('<f4', copy=False), 'f32'
+    return arr, None
 
 
-def generate_struct_html(var_name, struct_data, max_rows):
-    """Generate HTML for struct"""
+def encode_array(arr, precision='f32'):
+    """Encode an array for embedding in the page.
     
-    html = ['<div class="struct-container"><ul class="struct-list">']
+    Numeric arrays are down-cast (see downcast_array), gzip compressed when
+    that makes them smaller, and shipped as base64 encoded little-endian
+    bytes which the browser decodes straight into a typed array. Anything
+    else falls back to a flat JSON list.
+    
+    Returns:
+    --------
+    tuple
+        (payload, dtype, encoding) where dtype is 'f32', 'f64', an integer
+        tag ('i8', 'u8', 'i16', 'u16', 'i32', 'u32') or 'json' and encoding is 'gzip+b64', 'b64' or 'json'
+    """
+    data, dtype = downcast_array(arr, precision)
+    if dtype is not None:
+        payload, encoding = pack_array(data)
+        return payload, dtype, encoding
+    # '<\/' keeps strings like '</script>' from ending the data block early
+    return dumps_json(arr.ravel().tolist()).replace('</', '<\\/'), 'json', 'json'
+
+
+def pack_array(data):
+    """Return (payload, encoding) for already down-cast numeric data.
+    
+    The bytes are gzip compressed when that makes them smaller and base64
+    encoded; encoding is 'gzip+b64' or 'b64'.
+    """
+    raw = np.ascontiguousarray(data).tobytes()
+    # Level 1 runs close to memcpy speed and still catches the
+    # repetition in float data (constant exponents, repeated values)
+    packed = gzip.compress(raw, compresslevel=1, mtime=0)
+    if len(packed) < len(raw):
+        return base64.b64encode(packed).decode('ascii'), 'gzip+b64'
+    return base64.b64encode(raw).decode('ascii'), 'b64'
+
+
+def dumps_json(values):
+    """Serialize a list to JSON, with orjson when it is installed"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(values, default=str).decode('utf-8')
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers beyond 64 bits; the stdlib copes
+    return json.dumps(values, default=str)
+
+
+def write_data_script(out, element_id, arr, precision='f32', max_embed=None, data_dir=None):
+    """Write the hidden <script> block holding the full data of `arr`.
+    
+    Numeric arrays with more than `max_embed` elements are saved to
+    `data_dir/<element_id>.npy` instead; the block then holds a preview of
+    every n-th row and a data-src link the page fetches on demand.
+    
+    2D arrays in column-major order (as read_matlab_variable returns them)
+    are written column by column and flagged data-order="F" rather than
+    transposed into a row-major copy; the page reorders them when used.
+    """
+    shape = ','.join(str(s) for s in arr.shape)
+    column_major = arr.ndim == 2 and arr.flags.f_contiguous and not arr.flags.c_contiguous
+    order = ' data-order="F"' if column_major else ''
+    if max_embed is not None and data_dir is not None and arr.size > max_embed:
+        data, dtype = downcast_array(arr.T if column_major else arr, precision)
+        if dtype is not None:
+            os.makedirs(data_dir, exist_ok=True)
+            file_name = f'{element_id}.npy'
+            # Same layout as the embedded blocks; the page ignores the header
+            np.save(os.path.join(data_dir, file_name), np.ascontiguousarray(data))
+            src = quote(f'{os.path.basename(data_dir)}/{file_name}')
+            stride = -(-arr.size // max_embed)
+            # Every n-th row of the down-cast data, so the preview has the
+            # same type as the .npy file and data-dtype fits both
+            preview = data[:, ::stride] if column_major else data[::stride]
+            payload, encoding = pack_array(preview)
+            out.write(f'<script type="application/octet-stream" id="{element_id}" data-dtype="{dtype}" '
+                      f'data-encoding="{encoding}" data-shape="{shape}"{order} data-src="{src}" '
+                      f'data-stride="{stride}">{payload}</script>')
+            out.write(f'<p class="truncated-msg">{arr.size:,} values are too many to embed; '
+                      f'full data in <a href="{src}" download>{file_name}</a></p>')
+            return
+    
+    payload, dtype, encoding = encode_array(arr.T if column_major else arr, precision)
+    mime = 'application/json' if dtype == 'json' else 'application/octet-stream'
+    out.write(f'<script type="{mime}" id="{element_id}" data-dtype="{dtype}" '
+              f'data-encoding="{encoding}" data-shape="{shape}"{order}>{payload}</script>')
+
+
+def write_csv(data_dir, file_name, header, arrays, precision='f32', label='Download CSV'):
+    """Write `arrays` side by side to data_dir/file_name as CSV.
+    
+    The arrays (1D or 2D) share their first dimension; each row starts with
+    its index. Floats get 7 significant digits for precision 'f32' and
+    round-trip exact values for 'f64', matching the embedded data. Returns
+    the download link markup (text `label`), or '' when there is no
+    data_dir or the data is not plain numbers (e.g. complex records).
+    """
+    if data_dir is None or any(a.dtype.kind not in 'biuf' for a in arrays):
+        return ''
+    arrays = [a.reshape(len(a), -1) for a in arrays]
+    row_fmt = '%d' + ''.join(',' + csv_format(a, precision) for a in arrays for _ in range(a.shape[1])) + '\n'
+    block = max(1, _CSV_BLOCK // sum(a.shape[1] for a in arrays))
+    
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, file_name), 'w', encoding='utf-8', newline='') as f:
+        f.write(header + '\n')
+        # Interleave a block of columns (index first) into row order and
+        # format it with a single %-operation over the repeated row
+        # template. Each array goes through its own tolist(), so columns
+        # keep their own type (uint64 stays exact, not cast via float64)
+        total = len(arrays[0])
+        for start in range(0, total, block):
+            stop = min(start + block, total)
+            columns = [range(start, stop)]
+            for a in arrays:
+                columns.extend(a[start:stop].T.tolist())
+            f.write((row_fmt * (stop - start)) % tuple(chain.from_iterable(zip(*columns))))
+    
+    src = quote(f'{os.path.basename(data_dir)}/{file_name}')
+    return f'<a class="button" href="{src}" download>{label}</a>'
+
+
+def csv_format(arr, precision='f32'):
+    """Return the %-format used for the values of `arr` in CSV files"""
+    if arr.dtype.kind in 'biu':
+        return '%d'
+    return '%r' if precision == 'f64' and arr.dtype.itemsize == 8 else '%.7g'
+
+
+def generate_struct_html(out, var_name, struct_data, max_rows):
+    """Write HTML for struct"""
+    
+    out.write('<div class="struct-container"><ul class="struct-list">')
     
     for field_name, field_value in struct_data.items():
-        html.append(f'<li><strong>{field_name}:</strong> ')
+        out.write(f'<li><strong>{html.escape(field_name)}:</strong> ')
         
         if isinstance(field_value, np.ndarray):
             if field_value.size < 10:
-                html.append(f'{field_value.tolist()}')
+                out.write(html.escape(f'{field_value.tolist()}'))
             else:
-                html.append(f'Array{field_value.shape} ({field_value.dtype})')
+                out.write(html.escape(f'Array{field_value.shape} ({field_value.dtype})'))
         elif isinstance(field_value, (list, dict)):
-            html.append(f'{str(field_value)[:200]}...')
+            out.write(f'{html.escape(str(field_value)[:200])}...')
         else:
-            html.append(f'{field_value}')
+            out.write(html.escape(f'{field_value}'))
         
-        html.append('</li>')
+        out.write('</li>')
     
-    html.append('</ul></div>')
-    return ''.join(html)
+    out.write('</ul></div>')
 
 
-def generate_cell_array_html(var_name, cell_data, max_rows):
-    """Generate HTML for cell array"""
+def generate_cell_array_html(out, var_name, cell_data, max_rows):
+    """Write HTML for cell array"""
     
-    html = [f'<div class="cell-container">']
-    html.append(f'<p><strong>Cell array with {len(cell_data)} elements</strong></p>')
-    html.append('<ol class="cell-list">')
+    out.write(f'<div class="cell-container">')
+    out.write(f'<p><strong>Cell array with {len(cell_data)} elements</strong></p>')
+    out.write('<ol class="cell-list">')
     
     display_count = min(len(cell_data), max_rows)
     
     for i in range(display_count):
         item = cell_data[i]
-        html.append('<li>')
+        out.write('<li>')
         
         if isinstance(item, np.ndarray):
             if item.size < 10:
-                html.append(f'Array: {item.tolist()}')
+                out.write(html.escape(f'Array: {item.tolist()}'))
             else:
-                html.append(f'Array{item.shape} ({item.dtype})')
+                out.write(html.escape(f'Array{item.shape} ({item.dtype})'))
         elif isinstance(item, str):
-            html.append(f'String: "{item}"')
+            out.write(f'String: "{html.escape(item)}"')
         else:
-            html.append(f'{type(item).__name__}: {str(item)[:100]}')
+            out.write(html.escape(f'{type(item).__name__}: {str(item)[:100]}'))
         
-        html.append('</li>')
+        out.write('</li>')
     
     if len(cell_data) > max_rows:
-        html.append(f'<li><em>... {len(cell_data) - max_rows} more elements ...</em></li>')
+        out.write(f'<li><em>... {len(cell_data) - max_rows} more elements ...</em></li>')
     
-    html.append('</ol></div>')
-    return ''.join(html)
+    out.write('</ol></div>')
 
 
-def get_html_header(mat_filename):
-    """Return HTML header with CSS styling"""
-    return f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>MATLAB Variables: {mat_filename}</title>
-    <style>
-        * {{ box-sizing: border-box; }}
-        body {{
+# Section writers by the type read_matlab_variable returns
+_HANDLERS = {
+    np.ndarray: generate_array_html,
+    dict: _write_dict,
+    list: _write_cell,
+    str: _write_str,
+}
+
+
+# Page styles and header, kept as plain constants so nothing has to parse
+# the CSS braces per call; only the title is substituted
+_CSS = '''
+        * { box-sizing: border-box; }
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             margin: 0;
             padding: 20px;
             background-color: #f5f5f5;
-        }}
-        h1 {{
+        }
+        h1 {
             color: #2c3e50;
             border-bottom: 3px solid #3498db;
             padding-bottom: 10px;
-        }}
-        h2 {{
+        }
+        h2 {
             color: #34495e;
             margin-top: 30px;
-        }}
-        .var-type {{
+        }
+        .var-type {
             color: #7f8c8d;
             font-size: 0.9em;
             font-weight: normal;
-        }}
-        .summary-table {{
+        }
+        .summary-table {
             width: 100%;
             border-collapse: collapse;
             margin: 20px 0;
             background: white;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        .summary-table th {{
+        }
+        .summary-table th {
             background-color: #3498db;
             color: white;
             padding: 12px;
             text-align: left;
-        }}
-        .summary-table td {{
+        }
+        .summary-table td {
             padding: 10px 12px;
             border-bottom: 1px solid #ecf0f1;
-        }}
-        .summary-table tr:hover {{
+        }
+        .summary-table tr:hover {
             background-color: #f8f9fa;
-        }}
-        .summary-table a {{
+        }
+        .summary-table a {
             color: #3498db;
             text-decoration: none;
             font-weight: 500;
-        }}
-        .summary-table a:hover {{
+        }
+        .summary-table a:hover {
             text-decoration: underline;
-        }}
-        .ts-length {{
+        }
+        .ts-length {
             color: #27ae60;
             font-weight: 500;
-        }}
-        .array-shape {{
+        }
+        .array-shape {
             color: #8e44ad;
             font-family: 'Courier New', monospace;
             font-size: 0.9em;
-        }}
-        .variable-section {{
+        }
+        .variable-section {
             background: white;
             margin: 20px 0;
             padding: 20px;
             border-radius: 8px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        .stats {{
+        }
+        .stats {
             background-color: #ecf0f1;
             padding: 10px;
             border-radius: 4px;
             margin: 10px 0;
             font-size: 0.9em;
-        }}
-        .data-table {{
+        }
+        .data-table {
             width: 100%;
             border-collapse: collapse;
             margin: 15px 0;
             font-size: 0.9em;
             overflow-x: auto;
-        }}
-        .data-table th {{
+        }
+        .data-table th {
             background-color: #34495e;
             color: white;
             padding: 10px;
             text-align: left;
             position: sticky;
             top: 0;
-        }}
-        .data-table td {{
+        }
+        .data-table td {
             padding: 8px 10px;
             border-bottom: 1px solid #ecf0f1;
-        }}
-        .data-table tbody tr:nth-child(even) {{
+        }
+        .data-table tbody tr:nth-child(even) {
             background-color: #f8f9fa;
-        }}
-        .data-table tbody tr:hover {{
+        }
+        .data-table tbody tr:hover {
             background-color: #e3f2fd;
-        }}
-        .truncated-msg {{
+        }
+        .truncated-msg {
             color: #7f8c8d;
             font-style: italic;
             text-align: center;
             margin: 10px 0;
-        }}
-        .button-group {{
+        }
+        .button-group {
             margin: 15px 0;
             text-align: center;
-        }}
-        button {{
+        }
+        button, a.button {
+            display: inline-block;
             background-color: #3498db;
             color: white;
+            text-decoration: none;
             border: none;
             padding: 10px 20px;
             margin: 5px;
@@ -563,65 +848,76 @@ def get_html_header(mat_filename):
             cursor: pointer;
             font-size: 0.9em;
             transition: background-color 0.3s;
-        }}
-        button:hover {{
+        }
+        button:hover, a.button:hover {
             background-color: #2980b9;
-        }}
-        .string-value {{
+        }
+        .string-value {
             background-color: #fef9e7;
             padding: 15px;
             border-left: 4px solid #f39c12;
             font-family: 'Courier New', monospace;
-        }}
-        .struct-list, .cell-list {{
+        }
+        .struct-list, .cell-list {
             background-color: #fafafa;
             padding: 15px 30px;
             border-radius: 4px;
-        }}
-        .struct-list li, .cell-list li {{
+        }
+        .struct-list li, .cell-list li {
             margin: 8px 0;
-        }}
-        .error {{
+        }
+        .error {
             color: #e74c3c;
             background-color: #fadbd8;
             padding: 10px;
             border-radius: 4px;
-        }}
-        .scalar-value {{
+        }
+        .scalar-value {
             font-size: 1.2em;
             padding: 10px;
             background-color: #e8f6f3;
             border-radius: 4px;
-        }}
-        .empty-array {{
+        }
+        .empty-array {
             color: #7f8c8d;
             padding: 10px;
             background-color: #f8f9fa;
             border-radius: 4px;
-        }}
-        .search-container {{
+        }
+        .search-container {
             margin: 20px 0;
-        }}
-        #searchBox {{
+        }
+        #searchBox {
             width: 100%;
             padding: 12px 20px;
             font-size: 1em;
             border: 2px solid #3498db;
             border-radius: 4px;
-        }}
-        .array-container {{
+        }
+        .array-container {
             overflow-x: auto;
-        }}
-    </style>
+        }
+'''
+
+_HEADER_TEMPLATE = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>MATLAB Variables: {title}</title>
+    <style>{css}    </style>
 </head>
 <body>
-    <h1>MATLAB Variables: {mat_filename}</h1>
+    <h1>MATLAB Variables: {title}</h1>
 '''
 
 
-def get_javascript():
-    """Return JavaScript for interactive features"""
-    return '''
+def get_html_header(mat_filename):
+    """Return HTML header with CSS styling"""
+    return _HEADER_TEMPLATE.format(title=html.escape(mat_filename), css=_CSS)
+
+
+_JAVASCRIPT = '''
 <script>
 function filterVariables() {
     const input = document.getElementById('searchBox');
@@ -638,34 +934,121 @@ function filterVariables() {
     }
 }
 
-function showAllRows(varName, dims) {
-    const dataElement = document.getElementById('data_' + varName);
+async function getArray(elementId) {
+    // Decode a hidden data block written by write_data_script()
+    const el = document.getElementById(elementId);
+    if (!el) return null;
+    if (el.dataset.dtype === 'json') return JSON.parse(el.textContent);
+    const data = (el.dataset.src && await fetchNpy(el)) || await decodeBlock(el);
+    return el.dataset.order === 'F' ? toRowMajor(data, getShape(elementId)[1]) : data;
+}
+
+function toRowMajor(data, numCols) {
+    // Blocks flagged data-order="F" hold one column after another
+    const numRows = data.length / numCols;
+    const rows = new data.constructor(data.length);
+    for (let j = 0, k = 0; j < numCols; j++) {
+        for (let i = 0; i < numRows; i++, k++) {
+            rows[i * numCols + j] = data[k];
+        }
+    }
+    return rows;
+}
+
+const ARRAY_TYPES = {
+    f32: Float32Array, f64: Float64Array,
+    i8: Int8Array, u8: Uint8Array, i16: Int16Array, u16: Uint16Array,
+    i32: Int32Array, u32: Uint32Array
+};
+
+async function fetchNpy(el) {
+    // Load the full data of an array too large to embed from its .npy file
+    if (el.npyData) return el.npyData;
+    try {
+        const response = await fetch(el.dataset.src);
+        if (!response.ok) throw new Error(response.statusText);
+        const buffer = await response.arrayBuffer();
+        const view = new DataView(buffer);
+        // .npy: magic (6), version (2), header length (2 bytes in v1, 4 after)
+        const offset = view.getUint8(6) === 1 ? 10 + view.getUint16(8, true) : 12 + view.getUint32(8, true);
+        el.npyData = new ARRAY_TYPES[el.dataset.dtype](buffer, offset);
+        return el.npyData;
+    } catch (e) {
+        alert('Could not load ' + el.dataset.src + ' (' + e.message + '). Browsers may block ' +
+              'loading files from disk; serve the folder over HTTP to get the full data. ' +
+              'Using the embedded preview (1 in ' + el.dataset.stride + ' rows) instead.');
+        return null;
+    }
+}
+
+async function decodeBlock(el) {
+    let bytes = Uint8Array.from(atob(el.textContent), c => c.charCodeAt(0));
+    if (el.dataset.encoding === 'gzip+b64') {
+        const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+        bytes = new Uint8Array(await new Response(stream).arrayBuffer());
+    }
+    return new ARRAY_TYPES[el.dataset.dtype](bytes.buffer);
+}
+
+function getStride(elementId) {
+    // Rows between consecutive values from getArray(): the preview stride
+    // when the .npy file of a data-src block could not be loaded, else 1
+    const el = document.getElementById(elementId);
+    return el.dataset.stride && !el.npyData ? Number(el.dataset.stride) : 1;
+}
+
+function getShape(elementId) {
+    return document.getElementById(elementId).dataset.shape.split(',').map(Number);
+}
+
+function getDigits(elementId) {
+    // float32 data only carries ~7 significant digits; anything else is exact
+    return document.getElementById(elementId).dataset.dtype === 'f32' ? 7 : undefined;
+}
+
+function fmt(value, digits) {
+    // Round to `digits` significant digits (if given) and drop trailing zeros
+    if (typeof value !== 'number' || digits === undefined) return String(value);
+    return String(+value.toPrecision(digits));
+}
+
+function cell(value, digits) {
+    // Table cell markup; non-numeric (JSON) values are escaped
+    const text = fmt(value, digits);
+    if (typeof value === 'number') return '<td>' + text + '</td>';
+    return '<td>' + text.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;') + '</td>';
+}
+
+async function showAllRows(varName, dims) {
+    const data = await getArray('data_' + varName);
     const tableElement = document.getElementById('table_' + varName);
     
-    if (!dataElement || !tableElement) return;
+    if (!data || !tableElement) return;
+    const digits = getDigits('data_' + varName);
+    const stride = getStride('data_' + varName);
     
-    const data = JSON.parse(dataElement.textContent);
     const tbody = tableElement.getElementsByTagName('tbody')[0];
-    tbody.innerHTML = '';
     
+    // Build all rows as one string and assign once instead of per-cell DOM calls
+    const parts = [];
     if (dims === 1) {
         // 1D array
         for (let i = 0; i < data.length; i++) {
-            const row = tbody.insertRow();
-            row.insertCell(0).textContent = i;
-            row.insertCell(1).textContent = data[i];
+            parts.push('<tr><td>' + i * stride + '</td>' + cell(data[i], digits) + '</tr>');
         }
     } else if (dims === 2) {
-        // 2D array
-        const numCols = data[0].length;
-        for (let i = 0; i < data.length; i++) {
-            const row = tbody.insertRow();
-            row.insertCell(0).textContent = i;
+        // 2D array, stored row-major
+        const numCols = getShape('data_' + varName)[1];
+        const numRows = data.length / numCols;
+        for (let i = 0; i < numRows; i++) {
+            let row = '<tr><td>' + i * stride + '</td>';
             for (let j = 0; j < numCols; j++) {
-                row.insertCell(j + 1).textContent = data[i][j].toPrecision(6);
+                row += cell(data[i * numCols + j], 6);
             }
+            parts.push(row + '</tr>');
         }
     }
+    tbody.innerHTML = parts.join('');
     
     // Remove truncation message and show all button
     const container = tableElement.parentElement;
@@ -681,22 +1064,21 @@ function showAllRows(varName, dims) {
     }
 }
 
-function showAllRowsTS(varName) {
-    const dataElement = document.getElementById('data_' + varName);
+async function showAllRowsTS(varName) {
+    const time = await getArray('time_' + varName);
+    const data = await getArray('data_' + varName);
     const tableElement = document.getElementById('table_' + varName);
     
-    if (!dataElement || !tableElement) return;
+    if (!time || !data || !tableElement) return;
+    const stride = getStride('time_' + varName);
     
-    const data = JSON.parse(dataElement.textContent);
     const tbody = tableElement.getElementsByTagName('tbody')[0];
-    tbody.innerHTML = '';
     
-    for (let i = 0; i < data.Time.length; i++) {
-        const row = tbody.insertRow();
-        row.insertCell(0).textContent = i;
-        row.insertCell(1).textContent = data.Time[i].toPrecision(6);
-        row.insertCell(2).textContent = data.Data[i].toPrecision(6);
+    const parts = [];
+    for (let i = 0; i < time.length; i++) {
+        parts.push('<tr><td>' + i * stride + '</td>' + cell(time[i], 6) + cell(data[i], 6) + '</tr>');
     }
+    tbody.innerHTML = parts.join('');
     
     // Remove truncation message
     const container = tableElement.parentElement;
@@ -712,59 +1094,30 @@ function showAllRowsTS(varName) {
     }
 }
 
-function downloadCSV(varName, dims) {
-    const dataElement = document.getElementById('data_' + varName);
-    if (!dataElement) return;
-    
-    const data = JSON.parse(dataElement.textContent);
-    let csv = '';
+async function copyToClipboard(varName, dims) {
+    const data = await getArray('data_' + varName);
+    if (!data) return;
+    const digits = getDigits('data_' + varName);
     
-    if (dims === 1) {
-        csv = 'Index,Value\\n';
-        for (let i = 0; i < data.length; i++) {
-            csv += i + ',' + data[i] + '\\n';
-        }
-    } else if (dims === 2) {
-        // Header
-        csv = 'Row,' + Array.from({length: data[0].length}, (_, i) => i).join(',') + '\\n';
-        // Data
-        for (let i = 0; i < data.length; i++) {
-            csv += i + ',' + data[i].join(',') + '\\n';
-        }
-    }
-    
-    downloadFile(csv, varName + '.csv', 'text/csv');
-}
-
-function downloadCSV_TS(varName) {
-    const dataElement = document.getElementById('data_' + varName);
-    if (!dataElement) return;
-    
-    const data = JSON.parse(dataElement.textContent);
-    let csv = 'Index,Time,Data\\n';
-    
-    for (let i = 0; i < data.Time.length; i++) {
-        csv += i + ',' + data.Time[i] + ',' + data.Data[i] + '\\n';
-    }
-    
-    downloadFile(csv, varName + '_timeseries.csv', 'text/csv');
-}
-
-function copyToClipboard(varName, dims) {
-    const dataElement = document.getElementById('data_' + varName);
-    if (!dataElement) return;
-    
-    const data = JSON.parse(dataElement.textContent);
     let text = '';
     
     if (dims === 1) {
-        text = data.join('\\n');
+        text = Array.from(data, v => fmt(v, digits)).join('\\n');
     } else if (dims === 2) {
-        text = data.map(row => row.join('\\t')).join('\\n');
+        const numCols = getShape('data_' + varName)[1];
+        const numRows = data.length / numCols;
+        const lines = [];
+        for (let i = 0; i < numRows; i++) {
+            const row = data.slice(i * numCols, (i + 1) * numCols);
+            lines.push(Array.from(row, v => fmt(v, digits)).join('\\t'));
+        }
+        text = lines.join('\\n');
     } else if (dims === 'ts') {
+        const time = await getArray('time_' + varName);
+        const timeDigits = getDigits('time_' + varName);
         text = 'Time\\tData\\n';
-        for (let i = 0; i < data.Time.length; i++) {
-            text += data.Time[i] + '\\t' + data.Data[i] + '\\n';
+        for (let i = 0; i < time.length; i++) {
+            text += fmt(time[i], timeDigits) + '\\t' + fmt(data[i], digits) + '\\n';
         }
     }
     
@@ -773,21 +1126,34 @@ function copyToClipboard(varName, dims) {
     });
 }
 
-function downloadFile(content, fileName, mimeType) {
-    const blob = new Blob([content], { type: mimeType });
-    const url = URL.createObjectURL(blob);
-    const link = document.createElement('a');
-    link.href = url;
-    link.download = fileName;
-    document.body.appendChild(link);
-    link.click();
-    document.body.removeChild(link);
-    URL.revokeObjectURL(url);
+async function computeStats(varName) {
+    const data = await getArray('data_' + varName);
+    if (!data) return;
+    
+    let min = Infinity, max = -Infinity, sum = 0;
+    for (let i = 0; i < data.length; i++) {
+        const v = data[i];
+        if (v < min) min = v;
+        if (v > max) max = v;
+        sum += v;
+    }
+    
+    const stats = document.getElementById('stats_' + varName);
+    const stride = getStride('data_' + varName);
+    stats.textContent = 'Min: ' + fmt(min, 4) + ' | Max: ' + fmt(max, 4) + ' | Mean: ' + fmt(sum / data.length, 4) +
+                        (stride > 1 ? ' (preview only: 1 in ' + stride + ' rows)' : '');
+    const button = stats.nextElementSibling;
+    if (button) button.remove();
 }
 </script>
 '''
 
 
+def get_javascript():
+    """Return JavaScript for interactive features"""
+    return _JAVASCRIPT
+
+
 if __name__ == "__main__":
     import sys
     
@@ -1,6 +1,166 @@
+import copy
+from collections import OrderedDict
 import h5py
+import logging
+import math
 import numpy as np
 import os
+import re
+
+
+# Progress and diagnostics from read_matlab_variable; enable them with
+# logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+# MATLAB classes stored as plain numeric datasets
+_NUMERIC = frozenset(['double', 'single', 'int8', 'int16', 'int32', 'int64',
+                      'uint8', 'uint16', 'uint32', 'uint64', 'logical'])
+
+# Runs of two or more printable ASCII bytes in the MCOS metadata blob
+_ASCII_RUN = re.compile(rb'[ -~]{2,}')
+
+# Datasets bigger than this (in bytes) are read straight into a
+# preallocated array with a single H5Dread
+_READ_DIRECT_MIN = 1 << 20
+
+# Per-file results keyed by _file_key(), most recently used last: the
+# variable listing, and the MCOS row with the timeseries allocation tables
+# so reading several timeseries from one file runs the MCOS scan only once
+_FILE_CACHE_SIZE = 32
+_variables_cache = OrderedDict()
+_allocation_cache = OrderedDict()
+
+
+def _open(filename):
+    """Open a MAT file read-only; every reader entry point goes through here"""
+    # The default 1 MiB chunk cache is kept on purpose: datasets are always
+    # read whole, chunks bigger than the cache bypass it, and a larger cache
+    # only adds a copy through it (2x slower on a 4000x4000 double).
+    # Nothing is written, so HDF5's file lock is skipped (saves the lock
+    # round-trips on network filesystems, and works where locking is
+    # unsupported)
+    return h5py.File(filename, 'r', locking=False)
+
+
+def _file_key(filename):
+    """Identify a file's current contents by path, mtime and size"""
+    st = os.stat(filename)
+    return (os.path.abspath(filename), st.st_mtime_ns, st.st_size)
+
+
+def _cache_get(cache, key):
+    """Look up a per-file cache entry, marking it most recently used"""
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _cache_put(cache, key, value):
+    """Store a per-file cache entry, evicting the least recently used one"""
+    cache[key] = value
+    if len(cache) > _FILE_CACHE_SIZE:
+        cache.popitem(last=False)
+    return value
+
+
+def _squeezed(shape):
+    """Shape with the singleton axes dropped, as ndarray.squeeze() would give"""
+    return tuple(n for n in shape if n != 1)
+
+
+def _read_array(ds, shape=None):
+    """Read a whole dataset into memory, optionally as `shape` (same size)"""
+    if shape is None:
+        shape = ds.shape
+    if ds.size * ds.dtype.itemsize > _READ_DIRECT_MIN:
+        data = np.empty(shape, dtype=ds.dtype)
+        # Reshaping the contiguous buffer is a view, so H5Dread fills `data`
+        ds.read_direct(data.reshape(ds.shape))
+        return data
+    return ds[:].reshape(shape)
+
+
+def _read_numeric(ds):
+    """Read a MATLAB numeric array in MATLAB's dimension order"""
+    # MATLAB stores arrays in column-major order (Fortran-style)
+    # h5py reads them with transposed dimensions
+    # We need to transpose to get original MATLAB dimensions
+    # The layout is decided from ds.shape, before anything is read
+    shape = ds.shape
+    
+    if len(shape) == 1:
+        # 1D array - no transpose needed
+        return _read_array(ds)
+    elif shape.count(1) >= len(shape) - 1:
+        # Vector (multiple dimensions but only one non-singleton) -
+        # read straight into the squeezed buffer
+        return _read_array(ds, _squeezed(shape))
+    else:
+        # Multi-dimensional array - transpose to restore MATLAB dimensions
+        return _read_array(ds).T
+
+
+def _mcls(obj, default=None):
+    """Return the MATLAB_class attribute of an HDF5 object as str, or `default`.
+    
+    Reads the single attribute instead of building dict(obj.attrs), which
+    opens and decodes every attribute on the object.
+    """
+    value = obj.attrs.get('MATLAB_class')
+    if value is None:
+        return default
+    return value.decode('utf-8') if isinstance(value, bytes) else str(value)
+
+
+def _is_empty(obj):
+    """Return True if the object is flagged MATLAB_empty"""
+    # MATLAB writes an empty array as a uint64 vector of its dimensions, so
+    # any other dataset can skip the attribute lookup
+    if isinstance(obj, h5py.Dataset) and obj.dtype != np.uint64:
+        return False
+    return bool(obj.attrs.get('MATLAB_empty', 0))
+
+
+def _is_ref(dt):
+    """Check for an object-reference dtype, like h5py.check_dtype(ref=dt) == h5py.Reference"""
+    # h5py tags reference dtypes through the numpy dtype metadata
+    metadata = dt.metadata
+    return metadata is not None and metadata.get('ref') is h5py.Reference
+
+
+def _addr(obj):
+    """Return the object's address in its file, a stable key for HDF5 objects"""
+    return h5py.h5o.get_info(obj.id).addr
+
+
+def _is_number(dt):
+    """Same as np.issubdtype(dt, np.number), without the type-hierarchy walk"""
+    return dt.kind in 'iufc'
+
+
+def _iter_children(grp, skip_internal=False):
+    """Yield (name, object) for each member of an HDF5 group, in name order.
+    
+    Link names are listed in one pass and each child is opened directly
+    with h5o.open, skipping the name handling and membership checks of
+    grp[key] / grp.items(). With skip_internal, MATLAB's internal '#...'
+    groups (#refs#, #subsystem#) are not opened at all.
+    """
+    names = []
+    grp.id.links.iterate(names.append)
+    for name in names:
+        if skip_internal and name.startswith(b'#'):
+            continue
+        oid = h5py.h5o.open(grp.id, name)
+        if isinstance(oid, h5py.h5d.DatasetID):
+            obj = h5py.Dataset(oid)
+        elif isinstance(oid, h5py.h5g.GroupID):
+            obj = h5py.Group(oid)
+        else:
+            obj = h5py.Datatype(oid)
+        yield name.decode('utf-8'), obj
 
 
 def list_matlab_variables(filename):
@@ -29,30 +189,30 @@ def list_matlab_variables(filename):
         abs_path = os.path.abspath(filename)
         raise FileNotFoundError(f"File not found: {filename}\nAbsolute path attempted: {abs_path}")
     
+    # Reuse the listing until the file changes; callers get their own copy
+    cache_key = _file_key(filename)
+    cached = _cache_get(_variables_cache, cache_key)
+    if cached is not None:
+        return dict(cached)
+    
     variables = {}
     
     try:
-        with h5py.File(filename, 'r') as f:
-            # Iterate through all items in the root group
-            for key in f.keys():
-                # Skip internal HDF5 groups
-                if key.startswith('#'):
-                    continue
-                
-                item = f[key]
-                
+        with _open(filename) as f:
+            # Iterate through all items in the root group, skipping
+            # internal HDF5 groups
+            for key, item in _iter_children(f, skip_internal=True):
                 # Determine the datatype
                 if isinstance(item, h5py.Group):
                     # It's a group (likely a struct)
-                    matlab_class = item.attrs.get('MATLAB_class', b'struct').decode('utf-8')
+                    matlab_class = _mcls(item, 'struct')
                     variables[key] = matlab_class
                 elif isinstance(item, h5py.Dataset):
                     # It's a dataset
-                    matlab_class = item.attrs.get('MATLAB_class', b'unknown').decode('utf-8')
+                    matlab_class = _mcls(item, 'unknown')
                     
                     # Add shape information for arrays
-                    if matlab_class in ['double', 'single', 'int8', 'int16', 'int32', 'int64', 
-                                       'uint8', 'uint16', 'uint32', 'uint64', 'logical']:
+                    if matlab_class in _NUMERIC:
                         shape = item.shape
                         if len(shape) == 1:
                             variables[key] = f"{matlab_class} (1D array, length {shape[0]})"
@@ -60,7 +220,7 @@ def list_matlab_variables(filename):
                             variables[key] = f"{matlab_class} ({shape[1]}×{shape[0]})"  # Transposed for MATLAB convention
                         else:
                             # nD array
-                            shape_str = '×'.join(str(s) for s in reversed(shape))  # Reverse for MATLAB convention
+                            shape_str = '×'.join(map(str, shape[::-1]))  # Reverse for MATLAB convention
                             variables[key] = f"{matlab_class} ({shape_str})"
                     else:
                         variables[key] = matlab_class
@@ -71,7 +231,8 @@ def list_matlab_variables(filename):
                      f"Ensure the file is in MATLAB v7.3 format.\n"
                      f"Original error: {str(e)}")
     
-    return variables
+    _cache_put(_variables_cache, cache_key, variables)
+    return dict(variables)
 
 
 def print_matlab_variables(filename):
@@ -134,280 +295,252 @@ def read_matlab_variable(filename, var_name):
     
     def decode_string(ds):
         """Decode MATLAB string/char array"""
-        if ds.dtype.kind == 'u':  # uint16 for chars
-            return ''.join(chr(c) for c in ds[:].flatten())
-        return ds[:].tobytes().decode('utf-16le', errors='ignore')
+        data = ds[:]
+        if data.dtype.kind == 'u':  # uint16 for chars
+            # The chars are UTF-16 code units: decode them all in one C-level
+            # call. surrogatepass keeps unpaired surrogates, as chr() did.
+            return data.astype('<u2', copy=False).tobytes().decode('utf-16-le', errors='surrogatepass')
+        return data.tobytes().decode('utf-16le', errors='ignore')
     
-    def process_dataset(ds):
-        """Process a dataset based on its MATLAB class"""
-        attrs = dict(ds.attrs)
-        matlab_class = attrs.get('MATLAB_class', b'').decode('utf-8') if 'MATLAB_class' in attrs else None
-        is_empty = attrs.get('MATLAB_empty', 0)
+    def process_dataset(ds, matlab_class=None):
+        """Process a dataset based on its MATLAB class (read if not given)"""
+        if matlab_class is None:
+            matlab_class = _mcls(ds)
         
         # Handle empty arrays
-        if is_empty:
+        if _is_empty(ds):
             return np.array([])
         
-        # Handle based on MATLAB class
-        if matlab_class in ['char', 'string']:
-            return decode_string(ds)
-        
-        elif matlab_class == 'cell':
-            # Cell arrays contain references to other objects
-            return process_cell_array(ds)
-        
-        elif matlab_class in ['double', 'single', 'int8', 'int16', 'int32', 'int64',
-                               'uint8', 'uint16', 'uint32', 'uint64', 'logical']:
-            # Numeric arrays
-            data = ds[:]
-            
-            # MATLAB stores arrays in column-major order (Fortran-style)
-            # h5py reads them with transposed dimensions
-            # We need to transpose to get original MATLAB dimensions
-            
-            if len(data.shape) == 1:
-                # 1D array - no transpose needed
-                return data
-            elif data.shape.count(1) >= len(data.shape) - 1:
-                # Vector (multiple dimensions but only one non-singleton) - squeeze it
-                return data.squeeze()
-            else:
-                # Multi-dimensional array - transpose to restore MATLAB dimensions
-                return data.T
-        
-        elif matlab_class == 'struct':
-            return process_struct(ds)
-        
-        else:
+        # Handle based on MATLAB class (see dataset_handlers below)
+        handler = dataset_handlers.get(matlab_class)
+        if handler is None:
             # Unknown type - return raw data
             return ds[:]
+        return handler(ds)
     
+    # process_struct, process_cell_array and process_group are only called
+    # while the file opened below is open and dereference through its `f`
     def process_struct(ds):
         """Process MATLAB struct (contains references to actual structure)"""
-        ref_type = h5py.check_dtype(ref=ds.dtype)
-        if ref_type == h5py.Reference:
-            with h5py.File(filename, 'r') as f:
-                ref = ds[0, 0] if ds.shape[0] > 0 else None
-                if ref:
-                    obj = f[ref]
-                    if isinstance(obj, h5py.Group):
-                        return process_group(obj)
+        if _is_ref(ds.dtype):
+            ref = ds[0, 0] if ds.shape[0] > 0 else None
+            if ref:
+                obj = f[ref]
+                if isinstance(obj, h5py.Group):
+                    return process_group(obj)
             return {}
         return ds[:]
     
     def process_cell_array(ds):
         """Process MATLAB cell array (contains references)"""
         # Check if dataset contains object references
-        ref_type = h5py.check_dtype(ref=ds.dtype)
-        
-        if ref_type == h5py.Reference:
+        if _is_ref(ds.dtype):
             # Array of references
             refs = ds[:]
             result = []
-            with h5py.File(filename, 'r') as f:
-                for ref in refs.flatten():
-                    if ref:
-                        obj = f[ref]
-                        if isinstance(obj, h5py.Dataset):
-                            result.append(process_dataset(obj))
-                        elif isinstance(obj, h5py.Group):
-                            result.append(process_group(obj))
+            # Cells often point at the same object (e.g. repeated strings):
+            # decode each target once, keyed by its ObjectID (file + address),
+            # and hand out copies so cells stay independent values.
+            # References are resolved with the low-level h5r.dereference,
+            # skipping f[ref]'s high-level lookup
+            decoded = {}
+            fid = f.id
+            for ref in refs.ravel():
+                if ref:
+                    oid = h5py.h5r.dereference(ref, fid)
+                    if oid in decoded:
+                        result.append(copy.deepcopy(decoded[oid]))
+                        continue
+                    if isinstance(oid, h5py.h5d.DatasetID):
+                        value = process_dataset(h5py.Dataset(oid))
+                    elif isinstance(oid, h5py.h5g.GroupID):
+                        value = process_group(h5py.Group(oid))
                     else:
-                        result.append(None)
+                        continue
+                    decoded[oid] = value
+                    result.append(value)
+                else:
+                    result.append(None)
             
             # Return as list (don't reshape - cell arrays can have heterogeneous shapes)
             return result
         else:
             return ds[:]
     
-    def process_group(grp, parent_path=""):
+    def process_group(grp):
         """Process MATLAB struct or object stored as HDF5 group"""
         result = {}
-        grp_name = grp.name.lstrip('/')  # Get group name without leading /
         
-        for key in grp.keys():
-            item = grp[key]
-            # Build path for nested items (e.g., "myStruct/tsSig")
-            item_path = f"{grp_name}/{key}"
-            
+        for key, item in _iter_children(grp):
             if isinstance(item, h5py.Dataset):
-                # Check if this is a timeseries
-                attrs = dict(item.attrs)
-                if attrs.get('MATLAB_class') == b'timeseries':
-                    # Process as timeseries using the full path
-                    ts_result = process_timeseries(f, item_path)
+                # Check if this is a timeseries; the class is read once and
+                # handed on to process_dataset
+                matlab_class = _mcls(item)
+                if matlab_class == 'timeseries':
+                    # Process as timeseries (nested ones are found by address)
+                    ts_result = process_timeseries(f, item)
                     if ts_result is not None:
                         result[key] = ts_result
                     else:
-                        result[key] = process_dataset(item)
+                        result[key] = process_dataset(item, matlab_class)
                 else:
-                    result[key] = process_dataset(item)
+                    result[key] = process_dataset(item, matlab_class)
             elif isinstance(item, h5py.Group):
-                result[key] = process_group(item, item_path)
+                result[key] = process_group(item)
         return result
     
-    def process_timeseries(f, ts_varname):
+    def process_timeseries(f, ts_var):
         """Special handling for timeseries objects - uses allocation-based approach.
         
         MATLAB v7.3 stores timeseries with ref_idx values that indicate ORDER,
         not the actual MCOS slot. We must use the allocation algorithm to determine
         the correct time array for each timeseries.
         """
-        # Validate timeseries variable exists
-        if ts_varname not in f:
-            print(f"  [DEBUG] Timeseries '{ts_varname}' not found in file")
-            return None
-        
-        ts_var = f[ts_varname]
+        # Validate timeseries variable
         if not isinstance(ts_var, h5py.Dataset):
-            print(f"  [DEBUG] Timeseries '{ts_varname}' is not a Dataset")
-            return None
-        
-        # Get MCOS reference array
-        if '#subsystem#' not in f or 'MCOS' not in f['#subsystem#']:
-            print(f"  [DEBUG] No MCOS subsystem found in file")
+            logger.debug("Timeseries '%s' is not a Dataset", ts_var.name)
             return None
         
-        mcos = f['#subsystem#']['MCOS']
-        mcos_refs = mcos[0][:]  # Read entire row into memory to avoid repeated HDF5 access
-        
-        # ALWAYS use allocation algorithm (ref_idx does NOT directly map to slots)
-        allocation = _build_timeseries_allocation(f, mcos_refs)
+        # The MCOS row and the tables built from it only depend on the file,
+        # so they are read once and reused across calls until the file
+        # changes (object references stay valid across reopens)
+        cache_key = _file_key(filename)
+        cached = _cache_get(_allocation_cache, cache_key)
+        if cached is None:
+            # Get MCOS reference array
+            if '#subsystem#' not in f or 'MCOS' not in f['#subsystem#']:
+                logger.debug("No MCOS subsystem found in file")
+                return None
+            
+            mcos = f['#subsystem#']['MCOS']
+            mcos_refs = mcos[0][:]  # Read entire row into memory to avoid repeated HDF5 access
+            
+            # ALWAYS use allocation algorithm (ref_idx does NOT directly map to slots)
+            allocation, mcos_info = _build_timeseries_allocation(f, mcos_refs)
+            cached = _cache_put(_allocation_cache, cache_key, (mcos_refs, allocation, mcos_info))
+        mcos_refs, allocation, mcos_info = cached
         
         # Look up this timeseries in the allocation table
-        if ts_varname not in allocation:
-            print(f"  [DEBUG] Timeseries '{ts_varname}' not in allocation table")
-            print(f"  [DEBUG] Available in allocation: {list(allocation.keys())}")
+        entry = allocation.get(_addr(ts_var))
+        if entry is None:
+            logger.debug("Timeseries '%s' not in allocation table (%d allocated)",
+                         ts_var.name, len(allocation))
             # Try fallback: use direct ref_idx from timeseries metadata
-            return _fallback_timeseries_extraction(f, ts_var, mcos_refs)
+            return _fallback_timeseries_extraction(f, ts_var, mcos_refs, mcos_info)
         
-        time_idx, data_idx = allocation[ts_varname]
+        time_idx, data_idx = entry
         time_ref = mcos_refs[time_idx]
         time_obj = f[time_ref]
         
         # Validate this is actually time data (float64, reasonable shape)
         if not isinstance(time_obj, h5py.Dataset):
-            print(f"  [DEBUG] time_obj at index {time_idx} is not a Dataset")
-            return _fallback_timeseries_extraction(f, ts_var, mcos_refs)
+            logger.debug("time_obj at index %d is not a Dataset", time_idx)
+            return _fallback_timeseries_extraction(f, ts_var, mcos_refs, mcos_info)
         
         if time_obj.dtype != np.float64:
-            print(f"  [DEBUG] time_obj dtype is {time_obj.dtype}, expected float64")
-            return _fallback_timeseries_extraction(f, ts_var, mcos_refs)
-        
-        time_data = time_obj[:]
-        
-        # Sanity check: time data should be numeric and have reasonable values
-        if time_data.size == 0:
-            print(f"  [DEBUG] time_data is empty")
-            return _fallback_timeseries_extraction(f, ts_var, mcos_refs)
-        
-        n_samples = time_data.shape[1] if len(time_data.shape) == 2 else time_data.shape[0]
-        
-        # Get Data array - either from allocation or by searching
-        signal_data = None
-        
-        if data_idx is not None:
+            logger.debug("time_obj dtype is %s, expected float64", time_obj.dtype)
+            return _fallback_timeseries_extraction(f, ts_var, mcos_refs, mcos_info)
+        
+        # Sanity check: time data should be numeric and have reasonable values.
+        # Only the shape is needed here; the arrays are read once both the
+        # Time and the Data dataset have been found
+        if time_obj.size == 0:
+            logger.debug("time_data is empty")
+            return _fallback_timeseries_extraction(f, ts_var, mcos_refs, mcos_info)
+        
+        n_samples = time_obj.shape[1] if len(time_obj.shape) == 2 else time_obj.shape[0]
+        
+        def is_data(idx):
+            """Check the cached MCOS entry for a numeric array of n_samples"""
+            info = mcos_info[idx]
+            if info is None:
+                return False
+            dtype, shape, size = info
+            return _is_number(dtype) and (n_samples in shape or size == n_samples)
+        
+        # Get Data array - either from allocation or by searching.
+        # Candidates are checked against the dtypes/shapes recorded by the
+        # allocation scan; only the match is dereferenced
+        signal_obj = None
+        
+        if data_idx is not None and is_data(data_idx):
             # Data index was determined during allocation (Time/Data pairs)
-            try:
-                data_ref = mcos_refs[data_idx]
-                data_obj = f[data_ref]
-                if isinstance(data_obj, h5py.Dataset) and np.issubdtype(data_obj.dtype, np.number):
-                    if n_samples in data_obj.shape or data_obj.size == n_samples:
-                        signal_data = data_obj[:]
-            except:
-                pass
+            signal_obj = f[mcos_refs[data_idx]]
         
         # If no data_idx or it failed, search for Data array
-        if signal_data is None:
-            for offset in range(1, 20):
-                idx = time_idx + offset
-                if idx >= len(mcos_refs) or not mcos_refs[idx]:
-                    continue
-                
-                try:
-                    data_ref = mcos_refs[idx]
-                    data_obj = f[data_ref]
-                    
-                    if not isinstance(data_obj, h5py.Dataset):
-                        continue
-                    
-                    if not np.issubdtype(data_obj.dtype, np.number):
-                        continue
-                    
-                    if n_samples in data_obj.shape or data_obj.size == n_samples:
-                        signal_data = data_obj[:]
-                        break
-                except:
-                    pass
+        if signal_obj is None:
+            for idx in range(time_idx + 1, min(time_idx + 20, len(mcos_refs))):
+                if is_data(idx):
+                    signal_obj = f[mcos_refs[idx]]
+                    break
         
-        if signal_data is not None:
+        if signal_obj is not None:
             return {
-                'Time': time_data.flatten(),
-                'Data': signal_data.squeeze()
+                'Time': _read_array(time_obj, (time_obj.size,)),
+                'Data': _read_array(signal_obj, _squeezed(signal_obj.shape))
             }
         
-        print(f"  [DEBUG] Could not find Data array for Time at idx={time_idx}")
-        return _fallback_timeseries_extraction(f, ts_var, mcos_refs)
+        logger.debug("Could not find Data array for Time at idx=%d", time_idx)
+        return _fallback_timeseries_extraction(f, ts_var, mcos_refs, mcos_info)
     
-    def _fallback_timeseries_extraction(f, ts_var, mcos_refs):
+    def _fallback_timeseries_extraction(f, ts_var, mcos_refs, mcos_info):
         """Fallback method: try to extract timeseries using direct ref_idx.
         
-        This is used when the allocation algorithm fails.
+        This is used when the allocation algorithm fails. Candidates are
+        matched on the dtypes/shapes in mcos_info (from _scan_mcos); only the
+        Time/Data pair that matches is dereferenced and read.
         """
         try:
             # Get ref_idx directly from timeseries metadata (position [0,4])
             ts_data = ts_var[:]
             if ts_data.shape[1] >= 5:
                 ref_idx = int(ts_data[0, 4])
-                print(f"  [DEBUG] Fallback: trying direct ref_idx = {ref_idx}")
+                logger.debug("Fallback: trying direct ref_idx = %d", ref_idx)
                 
                 # Search around ref_idx for time-like arrays (float64, shape (1, N))
                 for search_idx in range(max(1, ref_idx - 10), min(len(mcos_refs), ref_idx + 30)):
-                    if not mcos_refs[search_idx]:
+                    info = mcos_info[search_idx]
+                    if info is None:
                         continue
                     
-                    try:
-                        obj = f[mcos_refs[search_idx]]
-                        if not isinstance(obj, h5py.Dataset):
+                    # Look for time-like array: float64, shape (1, N) or (N,) where N >= 2
+                    dtype, shape, size = info
+                    if dtype != np.float64:
+                        continue
+                    
+                    n_samples = None
+                    if len(shape) == 2 and shape[0] == 1 and shape[1] >= 2:
+                        n_samples = shape[1]
+                    elif len(shape) == 1 and shape[0] >= 2:
+                        n_samples = shape[0]
+                    
+                    if n_samples is None:
+                        continue
+                    
+                    # Data should be the NEXT array
+                    for data_idx in range(search_idx + 1, min(search_idx + 5, len(mcos_refs))):
+                        data_info = mcos_info[data_idx]
+                        if data_info is None:
                             continue
                         
-                        # Look for time-like array: float64, shape (1, N) or (N,) where N >= 2
-                        if obj.dtype == np.float64:
-                            n_samples = None
-                            if len(obj.shape) == 2 and obj.shape[0] == 1 and obj.shape[1] >= 2:
-                                n_samples = obj.shape[1]
-                            elif len(obj.shape) == 1 and obj.shape[0] >= 2:
-                                n_samples = obj.shape[0]
-                            
-                            if n_samples is not None:
-                                time_data = obj[:]
-                                
-                                # Data should be the NEXT array
-                                for data_offset in range(1, 5):
-                                    data_idx = search_idx + data_offset
-                                    if data_idx >= len(mcos_refs) or not mcos_refs[data_idx]:
-                                        continue
-                                    
-                                    try:
-                                        data_obj = f[mcos_refs[data_idx]]
-                                        if not isinstance(data_obj, h5py.Dataset):
-                                            continue
-                                        
-                                        if not np.issubdtype(data_obj.dtype, np.number):
-                                            continue
-                                        
-                                        if n_samples in data_obj.shape or data_obj.size == n_samples:
-                                            print(f"  [DEBUG] Fallback succeeded at idx {search_idx}, data at {data_idx}")
-                                            return {
-                                                'Time': time_data.flatten(),
-                                                'Data': data_obj[:].squeeze()
-                                            }
-                                    except:
-                                        pass
-                    except:
-                        pass
+                        data_dtype, data_shape, data_size = data_info
+                        if not _is_number(data_dtype):
+                            continue
+                        
+                        if n_samples in data_shape or data_size == n_samples:
+                            try:
+                                time_obj = f[mcos_refs[search_idx]]
+                                data_obj = f[mcos_refs[data_idx]]
+                                result = {
+                                    'Time': _read_array(time_obj, (size,)),
+                                    'Data': _read_array(data_obj, _squeezed(data_shape))
+                                }
+                            except (KeyError, OSError, ValueError):
+                                continue
+                            logger.debug("Fallback succeeded at idx %d, data at %d", search_idx, data_idx)
+                            return result
         except Exception as e:
-            print(f"  [DEBUG] Fallback failed: {e}")
+            logger.debug("Fallback failed: %s", e)
         
         return None
     
@@ -424,22 +557,11 @@ def read_matlab_variable(filename, var_name):
           - columns_per_ts: int (expected float64 arrays per timeseries)
         """
         try:
-            meta_blob = f[mcos_refs[0]][:].flatten()
+            meta_blob = f[mcos_refs[0]][:].reshape(-1)
             
             # Extract property names ending with underscore (data storage properties)
-            props = set()
-            i = 0
-            while i < len(meta_blob):
-                if 32 <= meta_blob[i] < 127:
-                    start = i
-                    while i < len(meta_blob) and 32 <= meta_blob[i] < 127:
-                        i += 1
-                    if i - start >= 2:
-                        s = bytes(meta_blob[start:i]).decode('ascii', errors='ignore')
-                        if s.endswith('_'):
-                            props.add(s)
-                else:
-                    i += 1
+            props = {run.decode('ascii') for run in _ASCII_RUN.findall(meta_blob.tobytes())
+                     if run.endswith(b'_')}
             
             has_time = 'Time_' in props
             has_data = 'Data_' in props
@@ -449,12 +571,32 @@ def read_matlab_variable(filename, var_name):
                 'has_data': has_data,
                 'columns_per_ts': (1 if has_time else 0) + (1 if has_data else 0)
             }
-        except:
+        except (IndexError, KeyError, OSError, ValueError):
             # Default assumption if metadata parsing fails
             return {'has_time': True, 'has_data': True, 'columns_per_ts': 2}
     
+    def _scan_mcos(f, mcos_refs):
+        """Describe every MCOS dataset as (dtype, shape, size); None for other entries.
+        
+        References are resolved with the low-level h5r.dereference (about
+        half the cost of f[ref]) and no Dataset wrappers are built. Index 0,
+        the MCOS metadata blob, is skipped.
+        """
+        mcos_info = [None] * len(mcos_refs)
+        for i in range(1, len(mcos_refs)):
+            if not mcos_refs[i]:
+                continue
+            try:
+                oid = h5py.h5r.dereference(mcos_refs[i], f.id)
+            except (KeyError, OSError, ValueError):
+                continue
+            if isinstance(oid, h5py.h5d.DatasetID):
+                shape = oid.shape
+                mcos_info[i] = (oid.dtype, shape, math.prod(shape))
+        return mcos_info
+    
     def _build_timeseries_allocation(f, mcos_refs):
-        """Build allocation table mapping timeseries names to MCOS time array indices.
+        """Build allocation table mapping timeseries (by object address) to MCOS time array indices.
         
         Args:
             f: HDF5 file handle
@@ -470,37 +612,37 @@ def read_matlab_variable(filename, var_name):
         
         This works because MATLAB assigns ref_idx values in file traversal order
         (alphabetical), and stores time data in the same order.
+        
+        Returns (allocation, mcos_info): allocation maps object address ->
+        (time_idx, data_idx or None); mcos_info holds (dtype, shape, size)
+        for every MCOS dataset, None for other entries.
         """
-        # Step 0: Validate metadata structure
+        # Step 0: Validate metadata structure. The MCOS datasets are
+        # described either way, for process_timeseries and the fallback
+        mcos_info = _scan_mcos(f, mcos_refs)
         ts_structure = _get_timeseries_structure_from_metadata(f, mcos_refs)
         if not ts_structure['has_time']:
             # No Time_ property - unusual timeseries format
-            return {}
+            return {}, mcos_info
         
         expected_columns = ts_structure['columns_per_ts']
         # Step 1: Find all timeseries in file with their ref_idx (recursively)
-        ts_list = []  # (name, ref_idx)
+        ts_list = []  # (address, ref_idx)
         
-        def find_timeseries_recursive(group, path_prefix=""):
+        def find_timeseries_recursive(group):
             """Recursively find all timeseries in groups"""
-            for key in group.keys():
-                if key.startswith('#'):
-                    continue
-                
-                item = group[key]
-                item_path = f"{path_prefix}/{key}" if path_prefix else key
-                
+            for key, item in _iter_children(group, skip_internal=True):
                 if isinstance(item, h5py.Dataset):
-                    attrs = dict(item.attrs)
-                    if attrs.get('MATLAB_class') == b'timeseries':
-                        try:
-                            ref_idx = int(item[0, 4])
-                            ts_list.append((item_path, ref_idx))
-                        except:
-                            pass
+                    # Timeseries are stored as 2D uint32 object references
+                    # with ref_idx at [0, 4]; only those need their
+                    # MATLAB_class read
+                    shape = item.shape
+                    if (item.dtype == np.uint32 and len(shape) == 2 and shape[0] >= 1
+                            and shape[1] >= 5 and _mcls(item) == 'timeseries'):
+                        ts_list.append((_addr(item), int(item[0, 4])))
                 
                 elif isinstance(item, h5py.Group):
-                    find_timeseries_recursive(item, item_path)
+                    find_timeseries_recursive(item)
         
         find_timeseries_recursive(f)
         
@@ -511,25 +653,19 @@ def read_matlab_variable(filename, var_name):
         # MATLAB stores Time/Data pairs: first is Time, second is Data
         # Find all float64 arrays with shape (1, N) where N >= 2, then take every other one
         # NOTE: Skip index 0 which is the MCOS metadata blob, not actual data
+        # Only float64 datasets qualify (this also skips the uint8 metadata
+        # entries); MATLAB writes empties as uint64, so no MATLAB_empty check
         all_arrays = []
-        for i in range(1, len(mcos_refs)):  # Start from 1 to skip metadata blob
-            if not mcos_refs[i]:
+        for i, info in enumerate(mcos_info):
+            if info is None:
                 continue
             
-            try:
-                obj = f[mcos_refs[i]]
-                attrs = dict(obj.attrs)
-                is_empty = attrs.get('MATLAB_empty', 0)
-                
-                # Additional check: skip if this looks like metadata (uint8 dtype is common for metadata)
-                if obj.dtype == np.uint8:
-                    continue
-                
-                if not is_empty and isinstance(obj, h5py.Dataset) and obj.dtype == np.float64:
-                    if len(obj.shape) == 2 and obj.shape[0] == 1 and obj.shape[1] >= 2:
-                        all_arrays.append(i)
-            except:
-                pass
+            dtype, shape, size = info
+            if dtype != np.float64:
+                continue
+            
+            if len(shape) == 2 and shape[0] == 1 and shape[1] >= 2:
+                all_arrays.append(i)
         
         # Determine if Data arrays have same shape as Time arrays
         # Use metadata structure + ratio to decide:
@@ -548,18 +684,28 @@ def read_matlab_variable(filename, var_name):
             data_indices = None
         
         # Step 4: Build allocation - position in sorted list = slot number
-        # Returns dict: name -> (time_idx, data_idx or None)
+        # Returns dict: object address -> (time_idx, data_idx or None)
         allocation = {}
-        for slot_num, (name, ref_idx) in enumerate(ts_sorted):
+        for slot_num, (addr, ref_idx) in enumerate(ts_sorted):
             if slot_num < len(time_indices):
                 time_idx = time_indices[slot_num]
                 data_idx = data_indices[slot_num] if data_indices and slot_num < len(data_indices) else None
-                allocation[name] = (time_idx, data_idx)
+                allocation[addr] = (time_idx, data_idx)
         
-        return allocation
+        return allocation, mcos_info
+    
+    # process_dataset's dispatch table, by MATLAB class
+    dataset_handlers = {
+        'char': decode_string,
+        'string': decode_string,
+        # Cell arrays contain references to other objects
+        'cell': process_cell_array,
+        'struct': process_struct,
+        **dict.fromkeys(_NUMERIC, _read_numeric),
+    }
     
     # Main function logic
-    with h5py.File(filename, 'r') as f:
+    with _open(filename) as f:
         # Check if variable exists
         if var_name not in f:
             available = [k for k in f.keys() if not k.startswith('#')]
@@ -569,41 +715,34 @@ def read_matlab_variable(filename, var_name):
         
         # Check if it's a Group or Dataset
         if isinstance(var, h5py.Group):
-            attrs = dict(var.attrs)
-            matlab_class = attrs.get('MATLAB_class', b'').decode('utf-8') if 'MATLAB_class' in attrs else 'struct'
-            print(f"Reading '{var_name}':")
-            print(f"  MATLAB class: {matlab_class}")
-            print(f"  Type: Group/Structure")
+            matlab_class = _mcls(var, 'struct')
+            logger.debug("Reading '%s': MATLAB class %s, Group/Structure", var_name, matlab_class)
         else:
-            attrs = dict(var.attrs)
-            matlab_class = attrs.get('MATLAB_class', b'').decode('utf-8') if 'MATLAB_class' in attrs else None
-            print(f"Reading '{var_name}':")
-            print(f"  MATLAB class: {matlab_class}")
-            print(f"  Shape: {var.shape}")
-            print(f"  Dtype: {var.dtype}")
+            matlab_class = _mcls(var)
+            logger.debug("Reading '%s': MATLAB class %s, shape %s, dtype %s",
+                         var_name, matlab_class, var.shape, var.dtype)
         
         # Handle based on type
         if matlab_class == 'timeseries':
-            result = process_timeseries(f, var_name)
+            result = process_timeseries(f, var)
             if result is not None:
-                print(f"  [OK] Timeseries with {len(result['Data'])} samples")
+                logger.debug("Timeseries with %d samples", len(result['Data']))
                 return result
             else:
-                print(f"  [WARN] Could not decode timeseries, returning raw data")
+                logger.warning("Could not decode timeseries '%s', returning raw data", var_name)
                 return var[:]
         
         elif isinstance(var, h5py.Group):
-            print(f"  Type: Group/Structure")
             return process_group(var)
         
         elif isinstance(var, h5py.Dataset):
-            result = process_dataset(var)
+            result = process_dataset(var, matlab_class)
             if isinstance(result, np.ndarray):
-                print(f"  [OK] Loaded successfully (returned shape: {result.shape})")
+                logger.debug("Loaded successfully (returned shape: %s)", result.shape)
             else:
-                print(f"  [OK] Loaded successfully")
+                logger.debug("Loaded successfully")
             return result
         
         else:
-            print(f"  [WARN] Unknown type, returning raw data")
+            logger.warning("Unknown type for '%s', returning raw data", var_name)
             return var[:]
@@ -0,0 +1,79 @@
+"""Shared fixtures: small MATLAB v7.3 files generated with h5py"""
+import os
+import sys
+
+import h5py
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _tag(obj, matlab_class):
+    obj.attrs['MATLAB_class'] = np.bytes_(matlab_class)
+    return obj
+
+
+def _char(parent, name, text):
+    # MATLAB stores char arrays as uint16 code points, one per row
+    return _tag(parent.create_dataset(name, data=np.array([[ord(ch)] for ch in text], dtype=np.uint16)), 'char')
+
+
+def _timeseries(parent, name, ref_idx):
+    # The timeseries variable itself is only an MCOS object reference;
+    # position [0, 4] holds its ref_idx into #subsystem#/MCOS
+    ts = parent.create_dataset(name, data=np.array([[0xDD000000, 2, 1, 1, ref_idx, 1]], dtype=np.uint32))
+    ts.attrs['MATLAB_object_decode'] = np.int32(3)
+    return _tag(ts, 'timeseries')
+
+
+@pytest.fixture
+def mat_file(tmp_path):
+    """Cells, empties, char, complex arrays and two allocated timeseries"""
+    path = str(tmp_path / 'fixture.mat')
+    rng = np.random.default_rng(0)
+    with h5py.File(path, 'w') as f:
+        refs = f.create_group('#refs#')
+        a = _tag(refs.create_dataset('a', data=rng.random((1, 5))), 'double')
+        b = _char(refs, 'b', 'abc')
+        cell = f.create_dataset('cellv', data=np.array([[a.ref], [b.ref], [a.ref]], dtype=h5py.ref_dtype))
+        _tag(cell, 'cell')
+        _tag(f.create_dataset('empty_cell', data=np.array([0, 0], dtype=np.uint64)), 'cell').attrs['MATLAB_empty'] = np.uint8(1)
+        _tag(f.create_dataset('empty_char', data=np.array([1, 0], dtype=np.uint64)), 'char').attrs['MATLAB_empty'] = np.uint8(1)
+        _char(f, 'name', 'hello wörld')
+        _tag(f.create_dataset('big_u64', data=np.array([[2 ** 63 + 1, 7, 2 ** 64 - 1]], dtype=np.uint64)), 'uint64')
+        complex_dt = np.dtype([('real', '<f8'), ('imag', '<f8')])
+        for name, shape in [('zv', (1, 300)), ('zm', (4, 3)), ('z3', (2, 4, 3))]:
+            z = np.empty(shape, dtype=complex_dt)
+            z['real'] = rng.random(shape)
+            z['imag'] = rng.random(shape)
+            _tag(f.create_dataset(name, data=z), 'double')
+        
+        # MCOS subsystem: metadata blob, then Time/Data pairs in ref_idx order
+        meta = refs.create_dataset('meta', data=np.frombuffer(b'\x00\x01Time_\x00Data_\x00junk\x02Name\x00',
+                                                              dtype=np.uint8).reshape(-1, 1))
+        mcos_refs = [meta.ref]
+        for name, n in [('tsA', 120), ('tsB', 60)]:
+            t = _tag(refs.create_dataset(f'time_{name}', data=np.linspace(0, 1, n).reshape(1, n)), 'double')
+            d = _tag(refs.create_dataset(f'data_{name}', data=rng.random((1, n))), 'double')
+            mcos_refs += [t.ref, d.ref]
+        f.create_group('#subsystem#').create_dataset('MCOS', data=np.array([mcos_refs], dtype=h5py.ref_dtype))
+        _timeseries(f, 'tsA', 2)
+        _timeseries(f, 'tsB', 3)
+    return path
+
+
+@pytest.fixture
+def fallback_ts_file(tmp_path):
+    """A timeseries whose Time array is 1-D, so the allocation table has no
+    slot for it and it is read through the direct ref_idx fallback"""
+    path = str(tmp_path / 'fallback.mat')
+    with h5py.File(path, 'w') as f:
+        refs = f.create_group('#refs#')
+        meta = refs.create_dataset('meta', data=np.frombuffer(b'\x00Time_\x00Data_\x00', dtype=np.uint8).reshape(-1, 1))
+        t = refs.create_dataset('t', data=np.linspace(0, 1, 30))
+        d = refs.create_dataset('d', data=np.arange(30, dtype=np.float32).reshape(1, 30))
+        f.create_group('#subsystem#').create_dataset('MCOS', data=np.array([[meta.ref, t.ref, d.ref]],
+                                                                            dtype=h5py.ref_dtype))
+        _timeseries(f, 'tsF', 1)
+    return path
@@ -0,0 +1,76 @@
+import logging
+
+import h5py
+import numpy as np
+
+from export_matlab_to_html import export_matlab_to_html
+from read_matlab_variable import list_matlab_variables, read_matlab_variable
+
+
+def test_cell_repeated_references_are_independent(mat_file):
+    cell = read_matlab_variable(mat_file, 'cellv')
+    assert len(cell) == 3
+    np.testing.assert_array_equal(cell[0], cell[2])
+    assert cell[1] == 'abc'
+    # The same #refs# entry is read once but each slot gets its own copy
+    assert cell[0] is not cell[2]
+    cell[0][0] = -1.0
+    assert cell[2][0] != -1.0
+
+
+def test_empty_and_char(mat_file):
+    for name in ('empty_cell', 'empty_char'):
+        value = read_matlab_variable(mat_file, name)
+        assert isinstance(value, np.ndarray) and value.size == 0
+    assert read_matlab_variable(mat_file, 'name') == 'hello wörld'
+
+
+def test_uint64_is_exact(mat_file):
+    value = read_matlab_variable(mat_file, 'big_u64')
+    assert value.dtype == np.uint64
+    assert value.tolist() == [2 ** 63 + 1, 7, 2 ** 64 - 1]
+
+
+def test_timeseries_from_allocation_table(mat_file, caplog):
+    with caplog.at_level(logging.DEBUG):
+        ts_a = read_matlab_variable(mat_file, 'tsA')
+        ts_b = read_matlab_variable(mat_file, 'tsB')
+    assert 'Fallback' not in caplog.text
+    assert ts_a['Time'].shape == ts_a['Data'].shape == (120,)
+    assert ts_b['Time'].shape == ts_b['Data'].shape == (60,)
+    np.testing.assert_allclose(ts_a['Time'], np.linspace(0, 1, 120))
+
+
+def test_timeseries_fallback(fallback_ts_file, caplog):
+    with caplog.at_level(logging.DEBUG):
+        ts = read_matlab_variable(fallback_ts_file, 'tsF')
+    assert 'Fallback succeeded' in caplog.text
+    np.testing.assert_allclose(ts['Time'], np.linspace(0, 1, 30))
+    np.testing.assert_array_equal(ts['Data'], np.arange(30, dtype=np.float32))
+
+
+def test_cache_sees_rewritten_file(mat_file):
+    assert 'zv' in list_matlab_variables(mat_file)
+    with h5py.File(mat_file, 'a') as f:
+        del f['zv']
+    assert 'zv' not in list_matlab_variables(mat_file)
+
+
+def test_export_complex_arrays(mat_file, tmp_path):
+    output = str(tmp_path / 'out.html')
+    # A stale sidecar file from an earlier export must be removed
+    data_dir = tmp_path / 'out_data'
+    data_dir.mkdir()
+    (data_dir / 'gone.csv').write_text('x')
+    
+    assert export_matlab_to_html(mat_file, output) == output
+    page = open(output, encoding='utf-8').read()
+    for name in ('zv', 'zm', 'z3', 'tsA', 'cellv'):
+        assert f'id="var_{name}"' in page
+    assert 'Could not read' not in page
+    assert 'first slice of 2' in page
+    
+    assert not (data_dir / 'gone.csv').exists()
+    assert (data_dir / 'tsA.csv').exists()
+    rows = (data_dir / 'big_u64.csv').read_text().splitlines()
+    assert rows[1:] == ['0,9223372036854775809', '1,7', '2,18446744073709551615']